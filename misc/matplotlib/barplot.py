@@ -15,7 +15,9 @@ import matplotlib as mpl
 mpl.use('Agg')
 import matplotlib.pyplot as plt
 import itertools
-import csv,re
+import csv,re,sys
+# LIBDIR
+from mplotlib import smoothing
 csv.register_dialect('tab', delimiter='\t', quoting=csv.QUOTE_NONE)
 
 style = None        # xkcd, ggplot, ...
@@ -25,22 +27,6 @@ if style=='xkcd':
 elif style!=None and style!='mine':
     plt.style.use(style)
 
-def smooth_data(x,window_len=11,window='hanning'):
-    if x.ndim != 1: raise Exception("smooth only accepts 1 dimension arrays.")
-    if x.size < window_len: raise Exception("Input vector needs to be bigger than window size.")
-    if window_len<3: return x
-    if not window in ['flat', 'hanning', 'hamming', 'bartlett', 'blackman']: raise Exception("Window is on of 'flat', 'hanning', 'hamming', 'bartlett', 'blackman'")
-    s = numpy.r_[x[window_len-1:0:-1],x,x[-1:-window_len:-1]]
-    if window == 'flat': # moving average
-        w = numpy.ones(window_len,'d')
-    else:
-        w = eval('numpy.'+window+'(window_len)')
-    y = numpy.convolve(w/w.sum(),s,mode='valid')
-    odd = 0
-    if window_len%2: odd = 1
-    y = y[(int(window_len/2)-1):-(int(window_len/2)+odd)]
-    return y
-
 def bignum(num):
     s = str(num); out = ''; slen = len(s)
     for i in range(slen):
@@ -108,7 +94,8 @@ for i in range(len(files)):
 
 smooth = None       # +smooth 3
 # smooth: smooth
-if smooth!=None: import numpy
+smooth_window = 'hanning'   # +smw flat, hamming, bartlett, blackman, tricube (LOWESS weights), savgol or savgol:3
+# smw: 'smooth_window'
 
 wh = (7,5)
 # wh: wh
@@ -150,7 +137,7 @@ for i in range(len(labels)):
         if ecolor==None: plt_args['edgecolor'] = cols[i]
     if i < len(lb): plt_args['label'] = lb[i]
     if smooth!=None:
-        ydat[i] = smooth_data(numpy.array(ydat[i],dtype=numpy.float64),smooth,'hanning')
+        ydat[i] = smoothing.smooth(ydat[i],smooth,smooth_window)
     if type=='hist':
         ax1.hist(ydat[i],wd,**plt_args)
     elif direction=='horizontal':
@@ -1,4 +1,4 @@
-#!/usr/bin/python
+#!/usr/bin/env python3
 #
 #   x y value
 #
@@ -9,9 +9,11 @@ import matplotlib as mpl
 mpl.use('Agg')
 import matplotlib.pyplot as plt
 import itertools
-import csv
+import sys
 import numpy
-csv.register_dialect('tab', delimiter='\t', quoting=csv.QUOTE_NONE)
+# LIBDIR
+from mplotlib import data,normalize
+# DATA_OPTS
 
 style = None        # xkcd, ggplot, ...
 # sty: 'style'
@@ -23,7 +25,7 @@ elif style!=None and style!='mine':
 files  = []
 # FILES
 
-if len(files)!=1: print 'Expected one file only'; sys.exit(1)
+if len(files)!=1: sys.exit('Expected one file only')
 
 (xmin,xmax) = (None,None)
 xlim = None
@@ -31,37 +33,22 @@ xlim = None
 if xlim!=None:
     (xmin,xmax) = xlim
 
-mpl.rcParams['axes.color_cycle'] = [ '#337ab7', '#f0ad4e', '#5cb85c', '#5bc0de', '#d9534f', 'grey', 'black' ]
+colors = [ '#337ab7', '#f0ad4e', '#5cb85c', '#5bc0de', '#d9534f', 'grey', 'black' ]
+try:
+    mpl.rcParams['axes.prop_cycle'] = mpl.cycler(color=colors)
+except:
+    # deprecated:
+    mpl.rcParams['axes.color_cycle'] = colors
 
-xdat = []
-ydat = []
-zdat = []
-for i in range(len(files)):
-    xdat.append([])
-    ydat.append([])
-    zdat.append([])
-    fname = files[i]
-    with open(fname, 'r') as f:
-        reader = csv.reader(f, 'tab')
-        tmp = []
-        for row in reader:
-            if row[0][0] == '#': continue
-            if xmin!=None and xmin>float(row[0]): continue
-            if xmax!=None and xmax<float(row[0]): continue
-            tmp.append(row)
-        xdat[i] = [float(x[0]) for x in tmp]
-        ydat[i] = [float(x[1]) for x in tmp]
-        zdat[i] = [float(x[2]) for x in tmp]
+dat  = data.read_files(files,[0,1,2],xcol=0,xmin=xmin,xmax=xmax)
+xdat = [x for x,y,z in dat]
+ydat = [y for x,y,z in dat]
+zdat = [z for x,y,z in dat]
 
 norm = None
 # norm: norm
 if norm!=None:
-    for i in range(len(files)):
-        max = float(ydat[i][0])
-        for y in ydat[i]:
-            if float(max)<float(y): max = float(y)
-        for j in range(len(ydat[i])):
-            ydat[i][j] = float(ydat[i][j])/max
+    for i in range(len(files)): ydat[i] = normalize.normalize(None,ydat[i],'max')
 
 
 wh = (7,5)
@@ -117,9 +104,9 @@ ylim = None
 if ylim!=None:                          # for example: +yr 0,1.1%
     (ymin,ymax) = ylim.split(',')
     if ymin[-1] == '%': 
-        ymin = float(ymin[0:-1])*min(min(ydat))
+        ymin = float(ymin[0:-1])*min([y.min() for y in ydat])
     if ymax[-1] == '%': 
-        ymax = float(ymax[0:-1])*float(max(max(ydat)))
+        ymax = float(ymax[0:-1])*max([y.max() for y in ydat])
     ax1.set_ylim(float(ymin),float(ymax))
 
 ylabel = None
@@ -1,4 +1,4 @@
-#!/usr/bin/python
+#!/usr/bin/env python3
 
 # CMDLINE
 
@@ -6,9 +6,11 @@ import matplotlib as mpl
 mpl.use('Agg')
 import matplotlib.pyplot as plt
 import itertools
-import csv
+import sys
 import numpy
-csv.register_dialect('tab', delimiter='\t', quoting=csv.QUOTE_NONE)
+# LIBDIR
+from mplotlib import data,normalize,smoothing
+# DATA_OPTS
 
 nrc = (1,1)     # nrows,ncols
 # nrc: nrc
@@ -20,23 +22,6 @@ if style=='xkcd':
 elif style!=None:
     plt.style.use(style)
 
-def smooth_data(x,window_len=11,window='hanning'):
-    if x.ndim != 1: raise ValueError, "smooth only accepts 1 dimension arrays."
-    if x.size < window_len: raise ValueError, "Input vector needs to be bigger than window size."
-    if window_len<3: return x
-    if not window in ['flat', 'hanning', 'hamming', 'bartlett', 'blackman']: raise ValueError, "Window is on of 'flat', 'hanning', 'hamming', 'bartlett', 'blackman'"
-    s = numpy.r_[x[window_len-1:0:-1],x,x[-1:-window_len:-1]]
-    if window == 'flat': # moving average
-        w = numpy.ones(window_len,'d')
-    else:
-        w = eval('numpy.'+window+'(window_len)')
-    y = numpy.convolve(w/w.sum(),s,mode='valid')
-    odd = 0
-    if window_len%2: odd = 1
-    y = y[(window_len/2-1):-(window_len/2+odd)]
-    return y
-
-
 def bignum(num):
     s = str(num); out = ''; slen = len(s)
     for i in range(slen):
@@ -53,34 +38,21 @@ xlim = None
 if xlim!=None:
     (xmin,xmax) = xlim
 
-mpl.rcParams['axes.color_cycle'] = [ '#337ab7', '#f0ad4e', '#5cb85c', '#5bc0de', '#d9534f', 'grey', 'black' ]
-
-xdat = []
-ydat = []
-for i in range(len(files)):
-    xdat.append([])
-    ydat.append([])
-    fname = files[i]
-    with open(fname, 'rb') as f:
-        reader = csv.reader(f, 'tab')
-        tmp = []
-        for row in reader:
-            if row[0][0] == '#': continue
-            if xmin!=None and xmin>float(row[0]): continue
-            if xmax!=None and xmax<float(row[0]): continue
-            tmp.append(row)
-        xdat[i] = [x[0] for x in tmp]
-        ydat[i] = [x[1] for x in tmp]
+colors = [ '#337ab7', '#f0ad4e', '#5cb85c', '#5bc0de', '#d9534f', 'grey', 'black' ]
+try:
+    mpl.rcParams['axes.prop_cycle'] = mpl.cycler(color=colors)
+except:
+    # deprecated:
+    mpl.rcParams['axes.color_cycle'] = colors
+
+dat  = data.read_files(files,[0,1],xcol=0,xmin=xmin,xmax=xmax)
+xdat = [x for x,y in dat]
+ydat = [y for x,y in dat]
 
 norm = None
 # norm: norm
 if norm!=None:
-    for i in range(len(files)):
-        max = float(ydat[i][0])
-        for y in ydat[i]:
-            if float(max)<float(y): max = float(y)
-        for j in range(len(ydat[i])):
-            ydat[i][j] = float(ydat[i][j])/max
+    for i in range(len(files)): ydat[i] = normalize.normalize(None,ydat[i],'max')
 
 
 wh = (7,5)
@@ -96,6 +68,8 @@ plt_args = {}       # for example: +pa "mec='grey',mfc='grey'"
 
 smooth = None
 # smooth: smooth
+smooth_window = 'hanning'   # +smw flat, hamming, bartlett, blackman, tricube (LOWESS weights), savgol or savgol:3
+# smw: 'smooth_window'
 lb = []
 # lb: ['lb']
 lt = []
@@ -125,7 +99,7 @@ for irow in range(len(ax)):
         label = ''
         if i <len(lb): label = lb[i]
         if smooth!=None:
-            ydat[i] = smooth_data(numpy.array(ydat[i],dtype=numpy.float64),smooth,'hanning')
+            ydat[i] = smoothing.smooth(ydat[i],smooth,smooth_window)
         ax[irow][icol].plot(xdat[i],ydat[i],line,label=label,**plt_args)
         i = i + 1
 
@@ -136,9 +110,9 @@ for irow in range(len(ax)):
         if ylim!=None:                          # for example: +yr 0,1.1%
             (ymin,ymax) = ylim.split(',')
             if ymin[-1] == '%': 
-                ymin = float(ymin[0:-1])*min(min(ydat))
+                ymin = float(ymin[0:-1])*min([y.min() for y in ydat])
             if ymax[-1] == '%': 
-                ymax = float(ymax[0:-1])*float(max(max(ydat)))
+                ymax = float(ymax[0:-1])*max([y.max() for y in ydat])
             ax[irow][icol].set_ylim(float(ymin),float(ymax))
         
         if ylabel!=None: ax[irow][icol].set_ylabel(ylabel)
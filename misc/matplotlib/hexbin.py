@@ -9,8 +9,10 @@ import matplotlib as mpl
 mpl.use('Agg')
 import matplotlib.pyplot as plt
 import itertools
-import csv
-csv.register_dialect('tab', delimiter='\t', quoting=csv.QUOTE_NONE)
+import sys
+# LIBDIR
+from mplotlib import data
+# DATA_OPTS
 
 style = None        # xkcd, ggplot, ...
 # sty: 'style'
@@ -28,19 +30,15 @@ if cdat!=None: cdat = []
 
 xdat = []
 ydat = []
+dat = data.read_files(files,[0,1,2] if cdat!=None else [0,1])
 for i in range(len(files)):
-    xdat.append([])
-    ydat.append([])
-    if cdat!=None: cdat.append([])
-    fname = files[i]
-    with open(fname, 'r') as f:
-        reader = csv.reader(f, 'tab')
-        tmp = []
-        for row in reader:
-            if row[0][0] != '#': tmp.append(row)
-        xdat[i] = [x[0] for x in tmp]
-        ydat[i] = [x[1] for x in tmp]
-        if cdat!=None: cdat[i] = [float(x[2]) for x in tmp]
+    if cdat!=None:
+        x,y,c = dat[i]
+        cdat.append(c)
+    else:
+        x,y = dat[i]
+    xdat.append(x)
+    ydat.append(y)
 
 wh = (7,5)
 # wh: wh
@@ -1,19 +1,27 @@
-#!/usr/bin/python
+#!/usr/bin/env python3
 #
 #   - X1  X2 ..          Xn           # first line is x-axis range if `+xa 1` is given
 #   Y1  y11 y12 y13 y14 .. y1n
 #   ..  ..
 #   Ym  ym1 ym2 ym3 ym4 .. ymn
 #
+# or a binary matrix (.npy, raw *.f32/*.f64 with --ncols) of the values only,
+# memory-mapped; the rows are then numbered from 0
+#
 
 import matplotlib as mpl
 mpl.use('Agg')
 import matplotlib.pyplot as plt
 from matplotlib.colors import LogNorm
 import itertools
+import numpy
 import csv
 import math
+import sys
 csv.register_dialect('tab', delimiter='\t', quoting=csv.QUOTE_NONE)
+# LIBDIR
+from mplotlib import data
+# DATA_OPTS
 
 dat    = []
 files  = []
@@ -43,6 +51,16 @@ iext = None
 for i in range(len(files)):
     dat.append([])
     fname = files[i]
+    if data.is_binary(fname):
+        mat = data.read_matrix(fname)
+        if xlim!=None: mat = mat[:,int(float(xlim[0])):int(float(xlim[1]))]
+        if xs!=None:
+            mx  = mat.max(axis=1)
+            mat = mat / numpy.where(mx>0,mx,1)[:,None]
+        ymin.append(0)
+        ymax.append(mat.shape[0])
+        dat[i] = mat
+        continue
     with open(fname, 'r') as f:
         reader = csv.reader(f, 'tab')
         tmp = []
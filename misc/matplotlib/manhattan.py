@@ -8,7 +8,11 @@
 import matplotlib as mpl
 mpl.use('Agg')
 import matplotlib.pyplot as plt
-import math
+import math,sys
+import numpy
+# LIBDIR
+from mplotlib import data
+# DATA_OPTS
 
 style = None        # xkcd, ggplot, ...
 # sty: 'style'
@@ -53,84 +57,51 @@ except:
     # deprecated: 
     mpl.rcParams['axes.color_cycle'] = colors
 
-def chrpos2x(dat,chr,pos,color=None):
-    global colors
-    if 'off' not in dat:
-        dat['off']  = {chr:0}
-        dat['prev_chr'] = chr
-        dat['prev_pos'] = pos
-        dat['chrpos']   = 0
-        dat['colors']   = []
-        dat['xticks']   = [0]
-        dat['xlbls']    = [chr]
-    if dat['prev_chr']!=chr:
-        if chr in dat['off']: 
-            print('Chromosomes not in blocks, see e.g. '+chr)
-            sys.exit(1)
-        dat['off'][chr] = dat['chrpos']
-        dat['prev_pos'] = 0
-        dat['xticks'].append(dat['chrpos'])
-        dat['xlbls'].append(chr)
-    if pos < dat['prev_pos']:
-        print('The file is not sorted, see e.g. '+chr+':'+pos)
+def chrpos2x(chr,pos):
+    # Chromosomes are placed one after another in the order of appearance,
+    # returns the x coordinates and the dict of tick positions and labels
+    dat = {'xticks':[],'xlbls':[],'block':numpy.zeros(0,dtype=int)}
+    if not len(chr): return pos,dat
+    beg = numpy.flatnonzero(numpy.r_[True,chr[1:]!=chr[:-1]])
+    end = numpy.r_[beg[1:],len(chr)]
+    if len(set(chr[beg]))!=len(beg):
+        seen = set()
+        for c in chr[beg]:
+            if c in seen: print('Chromosomes not in blocks, see e.g. '+c); sys.exit(1)
+            seen.add(c)
+    unsorted = numpy.flatnonzero(pos[1:]<pos[:-1]) + 1
+    unsorted = unsorted[chr[unsorted]==chr[unsorted-1]]
+    if len(unsorted):
+        i = unsorted[0]
+        print('The file is not sorted, see e.g. %s:%d' % (chr[i],pos[i]))
         sys.exit(1)
-    if color!=None:
-        dat['colors'].append(color)
-    elif len(dat['off'])%2:
-        dat['colors'].append(colors[0])
-    else:
-        dat['colors'].append(colors[1])
-    dat['xticks'][-1] = dat['off'][chr] + 0.5*pos
-    dat['prev_pos'] = pos
-    dat['prev_chr'] = chr
-    dat['chrpos'] = dat['off'][chr] + pos
-    return dat['chrpos']
-
-xdat = []
-ydat = []
-chrs = {}
-f = open(file, 'r')
-for line in f:
-    row = line.split("\t")
-    row[-1] = row[-1].rstrip('\n')
-    pval = float(row[2])
-    color = None
-    if type=='chr-x-y' and th!=None and pval<=th: color = th_args['color']      # color points above the line in the chr-x-y mode
-    if type=='chr-x-y-col' and row[3]!='.': color = row[3]                      # color provided explicitly by the caller
-    xval = chrpos2x(chrs,row[0],float(row[1]),color)
-    xdat.append(xval)
-    ydat.append(pval)  # pvalue
+    off = numpy.r_[0,numpy.cumsum(pos[end-1])[:-1]]
+    dat['block']  = numpy.repeat(numpy.arange(len(beg)),end-beg)
+    dat['xticks'] = list(off + 0.5*pos[end-1])
+    dat['xlbls']  = list(chr[beg])
+    return off[dat['block']] + pos,dat
+
+if type=='chr-x-y-col':
+    chr,pos,ydat,cdat = data.read_cols(file,[0,1,2,3],[str,float,float,str])
+else:
+    chr,pos,ydat = data.read_cols(file,[0,1,2],[str,float,float])
+xdat,chrs = chrpos2x(chr,pos)
+
+# default colors alternate between chromosomes
+chrs['colors'] = numpy.where(chrs['block']%2==0,colors[0],colors[1]).astype(object)
+if type=='chr-x-y' and th!=None: chrs['colors'][ydat<=th] = th_args['color']      # color points above the line in the chr-x-y mode
+if type=='chr-x-y-col':
+    explicit = cdat!='.'
+    chrs['colors'][explicit] = cdat[explicit]                                       # color provided explicitly by the caller
 
 # sort the dots so that the colored are on top
 sort_colors = 1
 if sort_colors==1:
-    from functools import cmp_to_key
-    cdat = chrs['colors']
-    idx = []
-    for i in range(len(xdat)):
-        idx.append(i)
-    def cmp_colors(a, b):
-        global cdat,colors
-        if cdat[a]==cdat[b]: return 0
-        adflt = 0
-        bdflt = 0
-        if cdat[a]==colors[0] or cdat[a]==colors[1]: adflt = 1
-        if cdat[b]==colors[0] or cdat[b]==colors[1]: bdflt = 1
-        if adflt==1 and bdflt==1: return 0
-        if adflt < bdflt: return 1
-        if adflt > bdflt: return -1
-        return 0
-    sidx = sorted(idx, key=cmp_to_key(cmp_colors))
-    xdat_new = []
-    ydat_new = []
-    cdat_new = []
-    for i in range(len(sidx)):
-        xdat_new.append(xdat[sidx[i]])
-        ydat_new.append(ydat[sidx[i]])
-        cdat_new.append(cdat[sidx[i]])
-    xdat = xdat_new
-    ydat = ydat_new
-    chrs['colors'] = cdat_new
+    is_dflt = (chrs['colors']==colors[0]) | (chrs['colors']==colors[1])
+    sidx = numpy.argsort(~is_dflt,kind='stable')
+    xdat = xdat[sidx]
+    ydat = ydat[sidx]
+    chrs['colors'] = chrs['colors'][sidx]
 
 yscale = None       # +ys -log10,log,symlog
 # ys: 'yscale'
@@ -145,17 +116,17 @@ if style=='mine': plt_args = {'zorder':100,'clip_on':False,'s':10}
 
 if yscale!=None:
     if yscale=='-log10':
-        for i in range(len(ydat)): ydat[i] = -math.log10(ydat[i])
+        ydat = -numpy.log10(ydat)
     else:
         ax1.set_yscale(yscale)
 
-ax1.scatter(xdat,ydat,c=chrs['colors'],**plt_args)
+dots = ax1.scatter(xdat,ydat,c=chrs['colors'],**plt_args)
 
 if th!=None:
     if yscale=='-log10':
         lth = -math.log10(th)
     th_args['color'] = colors[1]    # grey dashed line
-    ax1.plot([min(xdat),max(xdat)],[lth,lth],**th_args)
+    ax1.plot([xdat.min(),xdat.max()],[lth,lth],**th_args)
 
 ysci = None         # +ysci -2,2
 # ysci: (ysci)
@@ -165,8 +136,10 @@ ax1.set_xticks(chrs['xticks'])
 ax1.set_xticklabels(chrs['xlbls'])
 ax1.xaxis.set_tick_params(length=0)
 
-# remove overlapping labels
+# remove overlapping labels; the dots are not needed to place them, drawing millions would take long
+dots.set_visible(False)
 plt.gcf().canvas.draw()
+dots.set_visible(True)
 ticks = [tick for tick in plt.gca().get_xticklabels()]
 bnd = 0
 for i, t in enumerate(ticks):
@@ -197,9 +170,9 @@ ylim = None
 if ylim!=None:                          # for example: +yr 0,1.1%
     (ymin,ymax) = ylim.split(',')
     if ymin[-1] == '%':
-        ymin = float(ymin[0:-1])*min(min(ydat))
+        ymin = float(ymin[0:-1])*ydat.min()
     if ymax[-1] == '%':
-        ymax = float(ymax[0:-1])*float(max(max(ydat)))
+        ymax = float(ymax[0:-1])*ydat.max()
     ax1.set_ylim(float(ymin),float(ymax))
 
 
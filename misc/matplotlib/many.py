@@ -17,6 +17,9 @@ import matplotlib as mpl
 mpl.use('Agg')
 import matplotlib.pyplot as plt
 import sys
+# LIBDIR
+from mplotlib import data
+# DATA_OPTS
 
 style = None        # xkcd, ggplot, ...
 # sty: 'style'
@@ -45,25 +48,12 @@ if xlim!=None:
     if x[1]!='': xmax = float(x[1]); xlim['right'] = xmax
 
 colors = None
-xrow = None
-dat  = []
-reader = open(fname)
-for line in reader:
-    row = line.rstrip('\n').split('\t')
-    if xrow==None:
-        if row[0]=='color':
-            colors = []
-            xrow = row[1:]
-        else:
-            xrow = row
-        for i in range(len(xrow)): xrow[i] = float(xrow[i])
-        continue
-    if colors!=None:
-        if row[0][0]=='\\': row[0] = row[0][1:]
-        colors.append(row[0])
-        row = row[1:]
-    for i in range(len(row)): row[i] = float(row[i])
-    dat.append([xrow,row])
+rows = data.read_table(fname,str)
+if len(rows) and rows[0][0]=='color':
+    colors = [x[1:] if x[0]=='\\' else x for x in rows[1:,0]]
+    rows = rows[:,1:]
+rows = rows.astype(float)
+dat  = [[rows[0],row] for row in rows[1:]]
 
 yscale = None       # +ys log,symlog
 # ys: 'yscale'
@@ -134,9 +124,9 @@ ylim = None
 if ylim!=None:                          # for example: +yr 0,1.1%
     (ymin,ymax) = ylim.split(',')
     if ymin[-1] == '%': 
-        ymin = float(ymin[0:-1])*min(min(ydat))
+        ymin = float(ymin[0:-1])*min([row[1].min() for row in dat])
     if ymax[-1] == '%': 
-        ymax = float(ymax[0:-1])*float(max(max(ydat)))
+        ymax = float(ymax[0:-1])*max([row[1].max() for row in dat])
     ax1.set_ylim(float(ymin),float(ymax))
 
 ylabel = None
@@ -0,0 +1,5 @@
+#
+# Shared helpers for the mplot matplotlib templates. The templates find this
+# package either because they are run from this directory or because mplot
+# inserts the directory into sys.path in the generated plot.py (# LIBDIR)
+#
@@ -0,0 +1,140 @@
+#
+# Pixel aggregation of huge scatter layers (mplot +agg)
+#
+# Drawing a marker for each of millions of points is slow and its output is
+# mostly overdraw. The SAVE block of the generated plot.py calls
+# aggregate_scatter() before saving: the points of each large scatter layer are
+# binned into the pixel grid of its axes at the savefig dpi and the layer is
+# replaced by a single image with the same limits, zorder and colormap, so a
+# colorbar made for the scatter stays valid. The binned points are spread to
+# the radius of the layer's markers. Each pixel shows
+#   count .. the color of the last point drawn there, as plain overplotting
+#            would, its opacity growing with the log of the number of points
+#   mean, max, min
+#         .. the reduction of the color values (scatter c=) of the points in
+#            the pixel, mapped by the layer's colormap and norm
+# The default takes the mean for layers colored by value, count otherwise. The
+# points are binned in chunks, the memory does not grow with the input beyond
+# what matplotlib already holds.
+#
+
+import numpy
+import matplotlib
+from matplotlib.collections import PathCollection
+from matplotlib.image import AxesImage
+
+reductions = ['count','mean','max','min']
+CHUNK = 1<<20
+
+def _grid(ax,dpi):
+    pos = ax.get_position()
+    fig = ax.figure
+    return max(1,int(round(pos.width*fig.get_figwidth()*dpi))),max(1,int(round(pos.height*fig.get_figheight()*dpi)))
+
+def bin_points(xy,vals,extent,shape,reduction):
+    """
+    Reduce the points `xy` (n x 2) into a grid of `shape` (nx,ny) spanning
+    `extent` (x0,x1,y0,y1). Returns the per-pixel count and, for count, the
+    index of the last point in each pixel, otherwise the reduced `vals`.
+    Points outside the extent are dropped.
+    """
+    x0,x1,y0,y1 = extent
+    nx,ny = shape
+    cnt = numpy.zeros(nx*ny,dtype=numpy.int64)
+    if reduction=='count': out = numpy.full(nx*ny,-1,dtype=numpy.int64)
+    elif reduction=='mean': out = numpy.zeros(nx*ny)
+    else: out = numpy.full(nx*ny,numpy.nan)
+    for start in range(0,len(xy),CHUNK):
+        ix = numpy.floor((xy[start:start+CHUNK,0]-x0)*(nx/float(x1-x0)))
+        iy = numpy.floor((xy[start:start+CHUNK,1]-y0)*(ny/float(y1-y0)))
+        ok = (ix>=0) & (ix<nx) & (iy>=0) & (iy<ny)
+        idx = (iy[ok]*nx + ix[ok]).astype(numpy.int64)
+        cnt += numpy.bincount(idx,minlength=nx*ny)
+        if reduction=='count':
+            out[idx] = numpy.flatnonzero(ok) + start     # the last write wins
+            continue
+        v = vals[start:start+CHUNK][ok]
+        if reduction=='mean': out += numpy.bincount(idx,weights=v,minlength=nx*ny)
+        elif reduction=='max': numpy.fmax.at(out,idx,v)
+        else: numpy.fmin.at(out,idx,v)
+    if reduction=='mean':
+        with numpy.errstate(invalid='ignore',divide='ignore'): out = out/cnt
+    return cnt.reshape(ny,nx),out.reshape(ny,nx)
+
+def spread(rgba,priority,radius):
+    """Grow each pixel into a disk of `radius` pixels, the higher `priority` wins"""
+    if radius<1: return rgba
+    ny,nx = priority.shape
+    best = numpy.where(rgba[...,3]>0,priority,-numpy.inf)
+    pri  = best.copy()
+    out  = rgba.copy()
+    for dy in range(-radius,radius+1):
+        for dx in range(-radius,radius+1):
+            if (dx==0 and dy==0) or dx*dx+dy*dy>radius*radius: continue
+            # pixel (y,x) takes from (y-dy,x-dx)
+            dst = (slice(max(0,dy),ny+min(0,dy)),slice(max(0,dx),nx+min(0,dx)))
+            src = (slice(max(0,-dy),ny+min(0,-dy)),slice(max(0,-dx),nx+min(0,-dx)))
+            take = best[src] > pri[dst]
+            pri[dst] = numpy.where(take,best[src],pri[dst])
+            out[dst] = numpy.where(take[...,None],rgba[src],out[dst])
+    return out
+
+def _radius(coll,dpi):
+    sizes = coll.get_sizes()        # marker areas in points^2
+    if not len(sizes): return 0
+    return int(round(numpy.sqrt(numpy.median(sizes))/2.*dpi/72.))
+
+def _rgba(coll,cnt,out,reduction):
+    if reduction!='count':
+        rgba = coll.to_rgba(numpy.ma.masked_invalid(numpy.where(cnt>0,out,numpy.nan)))
+        rgba[cnt==0] = 0
+        return rgba
+    # colors of the points: from the color values or the face colors
+    if coll.get_array() is not None:
+        colors = coll.to_rgba(numpy.asarray(coll.get_array()).reshape(-1))
+    else:
+        colors = numpy.asarray(coll.get_facecolors())
+        if not len(colors): colors = numpy.asarray(coll.get_edgecolors())
+    rgba = numpy.zeros(cnt.shape+(4,))
+    hit = out>=0
+    rgba[hit] = colors[out[hit] % len(colors)]
+    alpha = 0.6 + 0.4*numpy.log1p(cnt)/numpy.log1p(max(1,cnt.max()))
+    rgba[...,3] *= numpy.where(hit,alpha,0)
+    return rgba
+
+def aggregate_scatter(fig,reduction='auto',threshold=1000000,dpi=None):
+    """
+    Replace the scatter layers of `fig` with more than `threshold` points by
+    images aggregated to the pixel grid, `dpi` defaults to the savefig dpi
+    """
+    if not reduction or reduction=='0': return
+    if reduction!='auto' and reduction not in reductions:
+        raise ValueError('Unknown +agg reduction "%s", choose from %s' % (reduction,','.join(reductions)))
+    if dpi==None:
+        dpi = matplotlib.rcParams['savefig.dpi']
+        if dpi=='figure': dpi = fig.dpi
+    for ax in fig.axes:
+        if ax.get_xscale()!='linear' or ax.get_yscale()!='linear': continue
+        for coll in list(ax.collections):
+            if not isinstance(coll,PathCollection) or coll.get_offset_transform()!=ax.transData: continue
+            xy = numpy.asarray(coll.get_offsets())
+            if len(xy) <= threshold: continue
+            red = reduction
+            vals = coll.get_array()
+            if red=='auto': red = 'mean' if vals is not None else 'count'
+            if red!='count' and vals is None: red = 'count'
+            if vals is not None: vals = numpy.asarray(vals,dtype=float).reshape(-1)
+
+            xlim,ylim = ax.get_xlim(),ax.get_ylim()
+            extent = (min(xlim),max(xlim),min(ylim),max(ylim))
+            cnt,out = bin_points(xy,vals,extent,_grid(ax,dpi),red)
+            img = AxesImage(ax,interpolation='nearest',origin='lower')
+            # later points overplot earlier ones, otherwise denser pixels win
+            img.set_data(spread(_rgba(coll,cnt,out,red),out if red=='count' else cnt,_radius(coll,dpi)))
+            img.set_extent(extent)
+            img.set_zorder(coll.get_zorder())
+            img.set_alpha(coll.get_alpha())
+            ax.add_image(img)
+            coll.remove()
+            ax.set_xlim(xlim)
+            ax.set_ylim(ylim)
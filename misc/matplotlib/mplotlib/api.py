@@ -0,0 +1,96 @@
+#
+# In-process API: render a template from numpy arrays, without writing the data
+# to files, running mplot or starting python again
+#
+#   sys.path.insert(0,'/path/to/utils/misc/matplotlib')
+#   from mplotlib import api
+#   api.render('xy',(x,y),output='plot.png',type='xy',xl='Position')
+#   api.render('violin',(grp,val),(grp2,val2),labels=['A','B'],output='violin.png,pdf')
+#   fig = api.render('hexbin',(x,y))        # no output, returns the figure
+#
+# Each dataset is a sequence of columns or a 2D array with one row per record;
+# the columns are those of the template's input file. The keyword arguments are
+# the +keys: strings are taken as written on the command line, tuples are joined
+# by commas (xr=(10,50) is +xr 10,50), other values are converted with repr(); a
+# list gives one value per dataset as repeated +keys do.
+#
+# Templates using the shared reader (mplotlib.data) read the arrays directly, the
+# others get them written to temporary files.
+#
+
+import os,sys,shutil,tempfile
+import numpy
+from mplotlib import template
+
+tmpl_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def template_path(name):
+    if os.path.exists(name): return name
+    path = os.path.join(tmpl_dir,name+'.py')
+    if not os.path.exists(path): raise ValueError('No such template: %s' % name)
+    return path
+
+def _columns(dataset):
+    if isinstance(dataset,numpy.ndarray) and dataset.ndim==2: return list(dataset.T)
+    return [numpy.asarray(x) for x in dataset]
+
+def _key_value(val):
+    if isinstance(val,list): return [_key_value(x) for x in val]
+    if isinstance(val,tuple): return ','.join([_key_value(x) for x in val])
+    if isinstance(val,numpy.generic): val = val.item()
+    if isinstance(val,str): return val
+    return repr(val)
+
+def _reads_arrays(path):
+    with open(path) as fh: return any([line.rstrip()=='# DATA_OPTS' for line in fh])
+
+def _write_tsv(fname,cols):
+    with open(fname,'w') as fh:
+        for row in zip(*cols): fh.write('\t'.join([str(x) for x in row])+'\n')
+
+def render(name,*datasets,output=None,labels=None,**keys):
+    """
+    Render the template `name` (e.g. 'xy' or a path) with the datasets. With
+    `output` given as for mplot -o, e.g. 'plot.png,pdf', the files are written
+    and their names returned; otherwise the matplotlib figure is returned.
+    """
+    path = template_path(name)
+    if labels==None: labels = [str(i+1) for i in range(len(datasets))]
+    if len(labels)!=len(datasets): raise ValueError('Expected %d labels, got %d' % (len(datasets),len(labels)))
+    if output!=None:
+        prefix,formats = output.rsplit('.',1)
+        formats = formats.split(',')
+    else:
+        prefix,formats = None,[]
+
+    tmp_dir = None
+    cols = [_columns(x) for x in datasets]
+    if _reads_arrays(path):
+        files = ['<array %d>' % (i+1) for i in range(len(cols))]
+        data_opts = {'arrays':dict(zip(files,cols))}
+    else:
+        tmp_dir = tempfile.mkdtemp(prefix='mplot.')
+        files = [os.path.join(tmp_dir,'%02d.dat' % (i+1)) for i in range(len(cols))]
+        for fname,dat in zip(files,cols): _write_tsv(fname,dat)
+        data_opts = {}
+
+    keys = { key:_key_value(val) for key,val in keys.items() }
+    if prefix==None: prefix = tmp_dir = tmp_dir if tmp_dir else tempfile.mkdtemp(prefix='mplot.')
+    if keys.get('prof'): os.makedirs(prefix,exist_ok=True)
+    params = {'template':path,'keys':keys,'labels':labels,'files':files,'files2':[],
+              'prefix':prefix,'formats':formats,'data_opts':data_opts,'libdir':tmpl_dir}
+
+    import matplotlib.pyplot as plt
+    from mplotlib import data
+    fig = None
+    try:
+        fig = template.run(params).figure
+    except SystemExit as e:
+        if e.code not in (None,0): raise RuntimeError('The template %s failed: %s' % (name,e.code))
+    finally:
+        data.opts['arrays'] = {}        # do not keep the caller's arrays alive
+        if tmp_dir: shutil.rmtree(tmp_dir,ignore_errors=True)
+    # the templates close the figure after saving it, return the one they drew
+    if output==None: return fig if fig!=None else plt.gcf()
+    plt.close('all')
+    return ['%s.%s' % (prefix,fmt) for fmt in formats]
@@ -0,0 +1,75 @@
+#
+# Columnar inputs: Parquet and Arrow IPC (Feather) files, read with pyarrow
+#
+# Only the columns the template asks for, after mapping through -f, are read;
+# Parquet skips the other column chunks entirely and the uncompressed Arrow IPC
+# files are memory-mapped. A column of one chunk, matching type and without
+# nulls reaches the template as a numpy view of the Arrow buffer, no copy is
+# made. pyarrow is optional, it is only needed for these files.
+#
+
+import numpy
+
+PARQUET_MAGIC = b'PAR1'
+
+def _pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError('Reading Parquet and Arrow files requires pyarrow: pip install pyarrow') from None
+    return pyarrow
+
+def _read_table(fname,cols):
+    _pyarrow()
+    with open(fname,'rb') as fh: hdr = fh.read(4)
+    if hdr==PARQUET_MAGIC:
+        import pyarrow.parquet as pq
+        pf = pq.ParquetFile(fname,memory_map=True)
+        names = pf.schema_arrow.names
+        return pf.read(columns=_names(fname,names,cols)),names
+    import pyarrow.feather as feather
+    table = feather.read_table(fname,memory_map=True)
+    names = table.column_names
+    return table.select(_names(fname,names,cols)),names
+
+def _names(fname,names,cols):
+    for col in cols:
+        if col>=len(names): raise ValueError('Could not get %d-th column of %s, only %d columns present' % (col+1,fname,len(names)))
+    return list(dict.fromkeys([names[col] for col in cols]))
+
+def _to_numpy(column,kind):
+    # zero-copy when possible, otherwise nulls become nan (floats) or None (strings)
+    if column.num_chunks==1: column = column.chunk(0)
+    else: column = column.combine_chunks()
+    if kind==str: return column.to_numpy(zero_copy_only=False).astype(str)
+    try:
+        arr = column.to_numpy(zero_copy_only=True)
+    except Exception:
+        arr = column.to_numpy(zero_copy_only=False)
+    return arr if arr.dtype.kind==numpy.dtype(kind).kind else arr.astype(kind)
+
+def read_cols(fname,cols,dtype,filters=None,sample=None,strata=None):
+    """
+    Read the 0-based columns `cols` of a Parquet or Arrow file as numpy arrays of
+    the types `dtype`. Only rows with all `filters` [col,value] fields equal to
+    the value, compared as text, are kept; `sample` is {'size':..,'seed':..} as
+    in data.read_cols.
+    """
+    pa = _pyarrow()
+    import pyarrow.compute as pc
+    fcols = [col for col,val in filters] if filters else []
+    scol  = [strata] if sample!=None and strata!=None else []
+    table,names = _read_table(fname,list(cols)+fcols+scol)
+    if filters:
+        mask = None
+        for col,val in filters:
+            eq = pc.equal(pc.cast(table.column(names[col]),pa.string()),val)
+            mask = eq if mask is None else pc.and_(mask,eq)
+        table = table.filter(pc.fill_null(mask,False))
+    out = [_to_numpy(table.column(names[col]),kind) for col,kind in zip(cols,dtype)]
+    if sample!=None:
+        from mplotlib import sample as smpl
+        keys = _to_numpy(table.column(names[strata]),str) if scol else None
+        idx  = smpl.sample_index(table.num_rows,sample['size'],sample['seed'],keys)
+        out  = [arr[idx] for arr in out]
+    return out
@@ -0,0 +1,49 @@
+#
+# Render many plot.py scripts (or plot.json, see template.py) generated by mplot
+# on a pool of worker processes.
+# The modules are imported once before the workers are forked, the workers then
+# render the scripts one by one. The output of each script goes to plot.log
+# next to it.
+#
+#   mplot --batch manifest.txt -j 8        # builds the plot.py files and calls this
+#   batch.py -j 8 list.txt                 # list of plot.py or plot.json files, one per line
+#
+
+import os,sys,time,argparse,multiprocessing
+
+if __package__ in (None,''):
+    sys.path.insert(0,os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from mplotlib import render
+
+def run_job(script):
+    start = time.time()
+    log = os.path.join(os.path.dirname(script),'plot.log')
+    with open(log,'w') as fh:
+        status = render.run_captured(script,None,fh.fileno())
+    return (script,status,time.time()-start,log)
+
+def main():
+    parser = argparse.ArgumentParser(description='Render plot.py scripts in parallel')
+    parser.add_argument('-j','--jobs',type=int,default=os.cpu_count(),help='number of worker processes [%(default)s]')
+    parser.add_argument('-p','--preload',default=','.join(render.preload_modules),help='comma-separated modules to import in the workers')
+    parser.add_argument('list',help='file with the list of plot.py scripts, one per line')
+    args = parser.parse_args()
+
+    with open(args.list) as fh:
+        scripts = [line.strip() for line in fh if line.strip()!='']
+
+    start = time.time()
+    nfail = 0
+    render.preload(args.preload.split(','))
+    print('# [1]Status\t[2]Wall time [s]\t[3]Script\t[4]Log')
+    with multiprocessing.get_context('fork').Pool(args.jobs) as pool:
+        for script,status,wtime,log in pool.imap_unordered(run_job,scripts):
+            if status!=0:
+                nfail += 1
+                with open(log) as fh: sys.stderr.write(fh.read())
+            print('%s\t%.2f\t%s\t%s' % ('ok' if status==0 else 'failed(%d)'%status,wtime,script,log),flush=True)
+    print('# %d jobs, %d failed, %.2fs' % (len(scripts),nfail,time.time()-start))
+    if nfail: sys.exit(1)
+
+if __name__ == '__main__':
+    main()
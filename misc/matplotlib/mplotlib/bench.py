@@ -0,0 +1,190 @@
+#
+# End-to-end benchmark of the mplot templates on synthetic data
+#
+#   bench.py -o bench.json                              # all templates, 1e3..1e8 rows
+#   bench.py -t xy,violin -n 1e3,1e4,1e5 -o bench.json
+#
+# Each plot is run in two phases, each in a separate process:
+#   prepare .. mplot processes the input and writes plot.py (run with -e true)
+#   render  .. python plot.py
+# and the wall time, peak RSS and the size of the files the phase produced are
+# recorded. A template which fails or exceeds the time limit is not run with the
+# larger inputs. The generated inputs are reused by templates of the same format.
+#
+
+import os,sys,json,time,shutil,tempfile,argparse,platform,subprocess,threading
+import numpy
+
+CHUNK = 1000000
+
+# -- Input generators, each yields chunks of (columns,formats) --
+
+def gen_xy(n,rng):
+    for start in range(0,n,CHUNK):
+        x = numpy.arange(start,min(n,start+CHUNK))
+        yield [x,numpy.sin(x*1e-3)+rng.normal(0,0.1,len(x))],['%d','%.5f']
+
+def gen_value(n,rng):
+    for start in range(0,n,CHUNK):
+        yield [rng.normal(0,1,min(CHUNK,n-start))],['%.5f']
+
+def gen_xy_rand(n,rng):
+    for start in range(0,n,CHUNK):
+        m = min(CHUNK,n-start)
+        yield [rng.normal(0,1,m),rng.normal(0,1,m)],['%.5f','%.5f']
+
+def gen_cat_value(n,rng):
+    cats = numpy.array(['grp%d' % i for i in range(8)])
+    for start in range(0,n,CHUNK):
+        m = min(CHUNK,n-start)
+        icat = rng.integers(0,len(cats),m)
+        yield [cats[icat],rng.normal(icat,1+0.1*icat)],['%s','%.5f']
+
+def gen_roc(n,rng):
+    for start in range(0,n,CHUNK):
+        m = min(CHUNK,n-start)
+        is_tp = rng.integers(0,2,m)
+        yield [rng.normal(is_tp,1),is_tp],['%.5f','%d']
+
+def gen_chr_pos(n,rng):
+    # sorted by chromosome and position, 22 chromosomes of equal size
+    nchr = 22
+    for start in range(0,n,CHUNK):
+        idx = numpy.arange(start,min(n,start+CHUNK))
+        chr = idx*nchr//n
+        pos = (idx - (chr*n+nchr-1)//nchr)*100 + 1
+        yield [chr+1,pos,rng.uniform(0,1,len(idx))],['%d','%d','%.3e']
+
+def gen_id_dist(n,rng):
+    # all pairs of k ids, k*(k-1)/2 >= n
+    k = int(numpy.ceil((1+numpy.sqrt(1+8*n))/2))
+    ids = numpy.array(['id%d' % i for i in range(k)])
+    nout = 0
+    i = 0
+    while nout < n:
+        m = min(k-i-1,n-nout)
+        yield [numpy.repeat(ids[i],m),ids[i+1:i+1+m],rng.uniform(0,1,m)],['%s','%s','%.5f']
+        nout += m
+        i += 1
+
+def gen_venn(n,rng):
+    for start in range(0,n,CHUNK):
+        m = min(CHUNK,n-start)
+        bits = rng.integers(0,2,(m,4))
+        bits[bits.sum(axis=1)==0,0] = 1
+        yield [numpy.array([''.join(x) for x in bits.astype(str)]),rng.uniform(0,1,m)],['%s','%.5f']
+
+# name: (template, generator, template arguments)
+benchmarks = {
+    'xy':           ('xy',        gen_xy,        ['+type','xy']),
+    'xy-density':   ('xy',        gen_value,     ['+type','density']),
+    'y':            ('xy',        gen_value,     ['+type','y']),
+    'hexbin':       ('hexbin',    gen_xy_rand,   []),
+    'violin':       ('violin',    gen_cat_value, []),
+    'box':          ('box',       gen_cat_value, []),
+    'sina':         ('sina',      gen_cat_value, ['+type','xy']),
+    'roc':          ('roc',       gen_roc,       []),
+    'manhattan':    ('manhattan', gen_chr_pos,   []),
+    'smatrix':      ('smatrix',   gen_id_dist,   []),
+    'upset':        ('upset',     gen_venn,      []),
+}
+
+def make_input(dir,gen,n,seed):
+    fname = os.path.join(dir,'%s.%d.txt' % (gen.__name__[4:],n))
+    if os.path.exists(fname): return fname
+    rng = numpy.random.default_rng(seed)
+    with open(fname+'.tmp','w') as fh:
+        for cols,fmt in gen(n,rng):
+            numpy.savetxt(fh,numpy.rec.fromarrays(cols),fmt=fmt,delimiter='\t')
+    os.replace(fname+'.tmp',fname)
+    return fname
+
+def dir_size(path):
+    if os.path.isfile(path): return os.path.getsize(path)
+    size = 0
+    for root,dirs,files in os.walk(path):
+        for file in files: size += os.path.getsize(os.path.join(root,file))
+    return size
+
+def run_phase(cmd,cwd,timeout):
+    """Returns the exit status, wall time in seconds, peak RSS in kB and the last line of stderr"""
+    err = tempfile.TemporaryFile(dir=cwd)
+    start = time.time()
+    proc  = subprocess.Popen(cmd,cwd=cwd,stdout=subprocess.DEVNULL,stderr=err)
+    timer = threading.Timer(timeout,proc.kill)
+    timer.start()
+    pid,status,rusage = os.wait4(proc.pid,0)
+    wall = time.time() - start
+    timer.cancel()
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    err.seek(0)
+    lines = err.read().decode(errors='replace').strip().split('\n')
+    msg = 'timeout' if wall>=timeout else lines[-1]
+    return proc.returncode,wall,rusage.ru_maxrss,msg
+
+def bench(name,n,args,dir):
+    tmpl,gen,tmpl_args = benchmarks[name]
+    fname  = make_input(dir,gen,n,args.seed)
+    prefix = '%s.%d' % (name,n)
+    out = []
+    rec = {'benchmark':name,'template':tmpl,'rows':n,'input_bytes':os.path.getsize(fname)}
+
+    # -e true: mplot writes plot.py but does not run it
+    cmd = [args.mplot,tmpl,'-F','-e','true','-o',prefix+'.png'] + tmpl_args + [os.path.basename(fname)]
+    status,wall,rss,msg = run_phase(cmd,dir,args.timeout)
+    out.append(dict(rec,phase='prepare',status=status,wall=wall,maxrss_kb=rss,output_bytes=dir_size(os.path.join(dir,prefix))))
+    if status: out[-1]['error'] = msg; return out
+
+    before = dir_size(os.path.join(dir,prefix))
+    status,wall,rss,msg = run_phase([args.exec,os.path.join(prefix,'plot.py')],dir,args.timeout)
+    png = os.path.join(dir,prefix+'.png')
+    out.append(dict(rec,phase='render',status=status,wall=wall,maxrss_kb=rss,
+        output_bytes=(os.path.getsize(png) if os.path.exists(png) else 0),cache_bytes=dir_size(os.path.join(dir,prefix))-before))
+    if status: out[-1]['error'] = msg
+    if not args.keep:
+        shutil.rmtree(os.path.join(dir,prefix),ignore_errors=True)
+        if os.path.exists(png): os.unlink(png)
+    return out
+
+def main():
+    mplot = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),'mplot')
+    parser = argparse.ArgumentParser(description='Benchmark of mplot templates on synthetic data')
+    parser.add_argument('-t','--templates',default=','.join(benchmarks),help='comma-separated benchmarks [%(default)s]')
+    parser.add_argument('-n','--rows',default='1e3,1e4,1e5,1e6,1e7,1e8',help='comma-separated input sizes [%(default)s]')
+    parser.add_argument('-o','--output',help='write the results as JSON to this file [stdout]')
+    parser.add_argument('-w','--workdir',help='directory for the inputs and plots [temporary]')
+    parser.add_argument('-k','--keep',action='store_true',help='keep the generated plots and inputs')
+    parser.add_argument('-T','--timeout',type=float,default=600,help='time limit per phase in seconds [%(default)s]')
+    parser.add_argument('-s','--seed',type=int,default=0,help='random seed of the generators [%(default)s]')
+    parser.add_argument('-e','--exec',default=sys.executable,help='python executable [%(default)s]')
+    parser.add_argument('-m','--mplot',default=mplot,help='mplot executable [%(default)s]')
+    args = parser.parse_args()
+
+    names = args.templates.split(',')
+    for name in names:
+        if name not in benchmarks: sys.exit('No such benchmark: %s, choose from %s' % (name,','.join(benchmarks)))
+    sizes = sorted([int(float(x)) for x in args.rows.split(',')])
+
+    dir = args.workdir if args.workdir else tempfile.mkdtemp(prefix='mplot-bench.')
+    if not os.path.exists(dir): os.makedirs(dir)
+    runs = []
+    try:
+        for name in names:
+            for n in sizes:
+                res = bench(name,n,args,dir)
+                for rec in res:
+                    print('%s\t%d\t%s\t%s\t%.2fs\t%dMB' % (name,n,rec['phase'],rec.get('error','ok'),rec['wall'],rec['maxrss_kb']/1024),file=sys.stderr)
+                runs.extend(res)
+                if res[-1]['status']: break
+    finally:
+        if not args.keep and not args.workdir: shutil.rmtree(dir,ignore_errors=True)
+
+    out = {'date':time.strftime('%Y-%m-%dT%H:%M:%S'),'host':platform.node(),'python':args.exec,'seed':args.seed,'runs':runs}
+    if args.output:
+        with open(args.output,'w') as fh: json.dump(out,fh,indent=1)
+    else:
+        json.dump(out,sys.stdout,indent=1)
+        print()
+
+if __name__ == '__main__':
+    main()
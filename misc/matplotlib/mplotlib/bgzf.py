@@ -0,0 +1,86 @@
+#
+# Streaming text access to plain, gzip and BGZF compressed files
+#
+# BGZF (bgzip, htslib) is a series of independent gzip blocks of at most 64kB,
+# each carrying its compressed size in the gzip header. The blocks can be
+# therefore located without decompressing and inflated in parallel; zlib
+# releases the GIL so threads suffice. Other gzip files are decompressed by
+# the gzip module.
+#
+
+import io,os,gzip,zlib,struct,collections
+from concurrent.futures import ThreadPoolExecutor
+
+GZIP_MAGIC = b'\x1f\x8b'
+
+def is_gzip(fname):
+    with open(fname,'rb') as fh: return fh.read(2)==GZIP_MAGIC
+
+def is_bgzf(fname):
+    with open(fname,'rb') as fh: hdr = fh.read(18)
+    return len(hdr)==18 and hdr[:4]==b'\x1f\x8b\x08\x04' and hdr[12:14]==b'BC'
+
+def _inflate(block):
+    # header: magic(2) CM FLG MTIME(4) XFL OS XLEN(2), extra field, deflate data, CRC32(4) ISIZE(4)
+    xlen = struct.unpack('<H',block[10:12])[0]
+    data = zlib.decompress(block[12+xlen:-8],-15)
+    crc,isize = struct.unpack('<II',block[-8:])
+    if len(data)!=isize or zlib.crc32(data)!=crc: raise IOError('Corrupted BGZF block')
+    return data
+
+class BgzfReader(io.RawIOBase):
+    """Raw binary stream of a BGZF file decompressed by a pool of threads"""
+    def __init__(self,fname,threads):
+        self.fh   = open(fname,'rb')
+        self.pool = ThreadPoolExecutor(threads)
+        self.ahead   = 4*threads
+        self.pending = collections.deque()
+        self.buf = b''
+        self.off = 0
+        self.eof = False
+
+    def readable(self):
+        return True
+
+    def _next_block(self):
+        hdr = self.fh.read(18)
+        if len(hdr)==0: return None
+        if len(hdr)<18 or hdr[:4]!=b'\x1f\x8b\x08\x04' or hdr[12:14]!=b'BC': raise IOError('Not a BGZF block: '+self.fh.name)
+        bsize = struct.unpack('<H',hdr[16:18])[0]
+        rest  = self.fh.read(bsize+1-18)
+        if len(rest)!=bsize+1-18: raise IOError('Truncated BGZF file: '+self.fh.name)
+        return hdr + rest
+
+    def _fill(self):
+        while not self.eof and len(self.pending) < self.ahead:
+            block = self._next_block()
+            if block==None: self.eof = True; break
+            self.pending.append(self.pool.submit(_inflate,block))
+
+    def readinto(self,b):
+        while self.off >= len(self.buf):
+            self._fill()
+            if not self.pending: return 0
+            self.buf = self.pending.popleft().result()
+            self.off = 0
+        n = min(len(b),len(self.buf)-self.off)
+        b[:n] = self.buf[self.off:self.off+n]
+        self.off += n
+        return n
+
+    def close(self):
+        if not self.closed:
+            self.pool.shutdown(cancel_futures=True)
+            self.fh.close()
+        super().close()
+
+def open_text(fname,threads=None):
+    """
+    Open a plain, gzip or BGZF compressed file for reading as text. BGZF blocks
+    are decompressed by `threads` threads, all available cores by default.
+    """
+    if not is_gzip(fname): return open(fname,'r')
+    if threads==None: threads = os.cpu_count() or 1
+    if threads>1 and is_bgzf(fname):
+        return io.TextIOWrapper(io.BufferedReader(BgzfReader(fname,threads),buffer_size=1<<20))
+    return gzip.open(fname,'rt')
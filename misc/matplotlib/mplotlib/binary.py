@@ -0,0 +1,62 @@
+#
+# Binary array inputs: .npy files and raw little-endian float32/float64 files
+# (*.f32, *.f64), both memory-mapped
+#
+# Nothing is parsed or copied up front: a column read by the template is a
+# strided view of the mapping and the pages are read from disk only when
+# matplotlib touches them. A 1D array is one column, a 2D array has one row per
+# record; raw files need the number of columns (mplot --ncols).
+#
+
+import numpy
+
+NPY_MAGIC = b'\x93NUMPY'
+
+def is_npy(fname):
+    try:
+        with open(fname,'rb') as fh: return fh.read(6)==NPY_MAGIC
+    except OSError:
+        return False
+
+def open_array(fname,raw=None):
+    """
+    Memory-map the array in `fname`: a .npy file, or a raw file with `raw` set to
+    {'dtype':'<f4','ncols':3}
+    """
+    if raw==None: arr = numpy.load(fname,mmap_mode='r')
+    else:
+        arr = numpy.memmap(fname,dtype=raw['dtype'],mode='r')
+        ncols = raw['ncols']
+        if len(arr) % ncols: raise ValueError('The size of %s is not a multiple of %d columns' % (fname,ncols))
+        arr = arr.reshape(-1,ncols)
+    if arr.ndim==1: arr = arr.reshape(-1,1)
+    if arr.ndim!=2: raise ValueError('Expected a 1D or 2D array in %s, found %d dimensions' % (fname,arr.ndim))
+    return arr
+
+def _column(arr,kind):
+    if kind==str: return arr.astype(str)
+    return arr if arr.dtype.kind==numpy.dtype(kind).kind else arr.astype(kind)
+
+def read_cols(fname,cols,dtype,raw=None,filters=None,sample=None,strata=None):
+    """
+    Read the 0-based columns `cols` of a binary array as numpy arrays of the
+    types `dtype`. Only rows with all `filters` [col,value] fields equal to the
+    value are kept; `sample` is {'size':..,'seed':..} as in data.read_cols.
+    """
+    arr = open_array(fname,raw)
+    for col in cols + [col for col,val in filters or []]:
+        if col>=arr.shape[1]: raise ValueError('Could not get %d-th column of %s, only %d columns present' % (col+1,fname,arr.shape[1]))
+    rows = None
+    if filters:
+        mask = numpy.ones(arr.shape[0],dtype=bool)
+        for col,val in filters: mask &= arr[:,col]==arr.dtype.type(val)
+        rows = numpy.flatnonzero(mask)
+    if sample!=None:
+        from mplotlib import sample as smpl
+        n    = arr.shape[0] if rows is None else len(rows)
+        keys = None
+        if strata!=None: keys = arr[:,strata] if rows is None else arr[rows,strata]
+        idx  = smpl.sample_index(n,sample['size'],sample['seed'],keys)
+        rows = idx if rows is None else rows[idx]
+    if rows is None: return [_column(arr[:,col],kind) for col,kind in zip(cols,dtype)]
+    return [_column(arr[rows,col],kind) for col,kind in zip(cols,dtype)]
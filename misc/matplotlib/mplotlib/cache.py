@@ -0,0 +1,84 @@
+#
+# Binary cache of parsed columns
+#
+# Each column is stored as a .npy file in the cache directory, next to the mplot
+# .dat copies. The source file is identified by its size, mtime and content hash
+# so that the cache survives mplot rewriting identical .dat files on every run.
+# Files read directly are cached under their .dat name together with the reader
+# options, a change of the selected fields invalidates the cache.
+# Cached columns are memory-mapped copy-on-write, the templates can modify them.
+#
+
+import os,json,hashlib
+import numpy
+
+def file_hash(fname):
+    md = hashlib.sha1()
+    with open(fname,'rb') as fh:
+        while True:
+            buf = fh.read(1<<20)
+            if not buf: break
+            md.update(buf)
+    return md.hexdigest()
+
+def _replace(fname,write):
+    tmp = fname + '.tmp.%d' % os.getpid()
+    with open(tmp,'wb') as fh: write(fh)
+    os.replace(tmp,fname)
+
+class ColumnCache:
+    def __init__(self,dir,fname,name=None,tag=None):
+        self.fname  = fname
+        self.tag    = tag
+        self.prefix = os.path.join(dir,os.path.basename(name if name!=None else fname))
+        self.meta_fname = self.prefix + '.cache.json'
+        self.meta = self._validate()
+
+    def _validate(self):
+        stat = os.stat(self.fname)
+        meta = None
+        try:
+            with open(self.meta_fname) as fh: meta = json.load(fh)
+        except (OSError,ValueError):
+            pass
+        if meta!=None and meta['size']==stat.st_size and meta.get('tag')==self.tag:
+            if meta['mtime']==stat.st_mtime_ns: return meta
+            if meta['hash']==file_hash(self.fname):
+                meta['mtime'] = stat.st_mtime_ns
+                self._write_meta(meta)
+                return meta
+        if meta!=None:
+            for col in meta['cols'].values():
+                try: os.unlink(os.path.join(os.path.dirname(self.prefix),col))
+                except OSError: pass
+        meta = {'size':stat.st_size,'mtime':stat.st_mtime_ns,'hash':file_hash(self.fname),'tag':self.tag,'cols':{}}
+        self._write_meta(meta)
+        return meta
+
+    def _write_meta(self,meta):
+        _replace(self.meta_fname,lambda fh: fh.write(json.dumps(meta).encode()))
+
+    def _key(self,col,dtype):
+        return '%d.%s' % (col,dtype.__name__)
+
+    def has(self,col,dtype):
+        return self._key(col,dtype) in self.meta['cols']
+
+    def load(self,col,dtype):
+        """Returns the cached column or None"""
+        key = self._key(col,dtype)
+        if key not in self.meta['cols']: return None
+        fname = os.path.join(os.path.dirname(self.prefix),self.meta['cols'][key])
+        try:
+            return numpy.load(fname,mmap_mode='c')
+        except ValueError:
+            return numpy.load(fname)        # empty arrays cannot be mapped
+        except OSError:
+            return None
+
+    def save(self,col,dtype,arr):
+        key = self._key(col,dtype)
+        fname = '%s.%s.npy' % (self.prefix,key)
+        _replace(fname,lambda fh: numpy.save(fh,arr))
+        self.meta['cols'][key] = os.path.basename(fname)
+        self._write_meta(self.meta)
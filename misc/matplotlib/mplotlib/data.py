@@ -0,0 +1,346 @@
+#
+# Column-oriented reader of the mplot .dat files and of plain, compressed,
+# columnar (Parquet, Arrow, see arrow.py) or binary (.npy, raw floats, see
+# binary.py) input files read directly
+#
+#   from mplotlib import data
+#   xdat,ydat = data.read_cols(fname,[0,1])
+#   grp,vals  = data.read_cols(fname,[0,1],[str,float])
+#   xdat,ydat = data.read_range(fname,[0,1],xmin=100,xmax=200)
+#   for grp,vals in data.read_chunks(fname,[0,1],[str,float]): ..   # bounded memory
+#   rows      = data.read_table(fname,str)                              # one row per line
+#
+# The generated plot.py configures the reader via set_opts() (# DATA_OPTS),
+#   cache   .. directory for the binary cache of the parsed columns
+#   files   .. per-file options keyed by the name in `files`, for files read directly
+#               instead of from a .dat copy:
+#                   path    .. the file to read
+#                   delim   .. field delimiter, None for whitespace
+#                   fields  .. 0-based columns seen by the template as columns 0,1,..
+#                   filters .. list of [col,value], only rows with all such fields equal are read
+#                   raw     .. raw binary file, {'dtype':'<f4','ncols':3}
+#   threads .. number of threads decompressing BGZF files [all cores]
+#   sample  .. random sample of the rows, {'size':1000,'seed':0}, see sample.py
+#   arrays  .. in-memory datasets keyed by the name in `files`, lists of columns (api.py)
+#   procs   .. number of processes parsing files in parallel in read_files() [all cores]
+#
+
+import os
+import re
+import numpy
+import warnings
+import itertools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from mplotlib.cache import ColumnCache
+from mplotlib import bgzf,sample,binary
+
+opts = { 'cache':None, 'files':{}, 'threads':None, 'sample':None, 'arrays':{}, 'procs':None }
+defaults = { key:(dict(val) if isinstance(val,dict) else val) for key,val in opts.items() }
+
+_skip_re  = re.compile(r'^(?:#[^\n]*|[^\S\n]*)(?:\n|\Z)',re.M)   # comments and blank lines
+_blank_re = re.compile(r'\n[^\S\n]*\n')
+
+# below this total size the files are parsed serially, starting the pool would cost more
+PARALLEL_MIN_BYTES = 16<<20
+
+CHUNK = 1<<22
+
+def set_opts(**kwargs):
+    for key in kwargs:
+        if key not in opts: raise ValueError('Unknown option: '+key)
+        opts[key] = kwargs[key]
+
+def reset_opts():
+    """Restore the defaults, for processes rendering more than one plot"""
+    for key,val in defaults.items(): opts[key] = dict(val) if isinstance(val,dict) else val
+
+def _data_blocks(fh):
+    # Lines starting with '#' and blank or whitespace-only lines are removed from
+    # whole blocks at once, the block is then split into lines for the numpy parser
+    while True:
+        buf = fh.read(1<<20)
+        if not buf: return
+        if buf[-1]!='\n': buf += fh.readline()
+        if '#' in buf or _blank_re.search('\n'+buf+'\n'): buf = _skip_re.sub('',buf)
+        if buf.endswith('\n'): buf = buf[:-1]
+        if buf: yield buf.split('\n')
+
+def _filter_blocks(blocks,delim,filters):
+    # Rows failing the col=value filters are dropped before numpy converts any
+    # field; the substring test rejects most of them without splitting the line
+    for lines in blocks:
+        out = []
+        for line in lines:
+            if not all([val in line for col,val in filters]): continue
+            vals = line.strip().split(delim)
+            if all([col<len(vals) and vals[col]==val for col,val in filters]): out.append(line)
+        yield out
+
+def _xval(line,delim,col):
+    try:
+        return float(line.strip().split(delim)[col])
+    except (IndexError,ValueError):
+        return numpy.nan
+
+def _range_blocks(blocks,delim,col,xmin,xmax):
+    # Input sorted by the column `col`: blocks ending before xmin are skipped
+    # by their last line, the reading stops at the first block past xmax; only
+    # the boundary blocks are filtered line by line
+    for lines in blocks:
+        if not lines: continue
+        first,last = _xval(lines[0],delim,col),_xval(lines[-1],delim,col)
+        if xmin!=None and last<xmin: continue
+        if xmax!=None and first>xmax: return
+        if (xmin==None or first>=xmin) and (xmax==None or last<=xmax):
+            yield lines
+            continue
+        yield [line for line in lines if (xmin==None or _xval(line,delim,col)>=xmin) and (xmax==None or _xval(line,delim,col)<=xmax)]
+        if xmax!=None and last>xmax: return
+
+def _loadtxt(src,cols,dtype,delim):
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')     # empty input
+        dat = numpy.loadtxt(src,delimiter=delim,comments=None,usecols=cols,dtype=dtype,ndmin=2,unpack=True)
+    if dat.shape[0]!=len(cols): return [numpy.empty(0,dtype=dtype) for x in cols]
+    return list(dat)
+
+def read_cols(fname,cols,dtype=float,strata=None):
+    """
+    Read selected columns of a tab-delimited file into typed numpy arrays.
+    Gzip and BGZF compressed files are decompressed on the fly, Parquet and
+    Arrow files are read column-wise, binary arrays are memory-mapped; these are
+    not cached.
+
+        fname   .. the file to read
+        cols    .. list of 0-based column indexes
+        dtype   .. float, int or str; either one for all columns or a list with one type per column
+        strata  .. column with groups sampled separately when sampling is enabled
+
+    Lines starting with '#' and blank lines are skipped. Returns a list of arrays in the order of `cols`.
+    """
+    if type(dtype)!=list: dtype = [dtype]*len(cols)
+    if len(dtype)!=len(cols): raise ValueError('Expected %d types, got %d' % (len(cols),len(dtype)))
+    if fname in opts['arrays']: return _array_cols(fname,cols,dtype)
+    fopts = opts['files'].get(fname,{})
+    if is_columnar(fopts.get('path',fname)): return _columnar_cols(fname,cols,dtype,strata)
+    if is_binary(fname): return _binary_cols(fname,cols,dtype,strata)
+    if opts['cache']==None: return _parse_cols(fname,cols,dtype,strata)
+
+    cache = _cache(fname,strata)
+    out   = [cache.load(col,kind) for col,kind in zip(cols,dtype)]
+    miss  = [i for i in range(len(cols)) if out[i] is None]
+    if not miss: return out
+    dat = _parse_cols(fname,[cols[i] for i in miss],[dtype[i] for i in miss],strata)
+    for i,arr in zip(miss,dat):
+        cache.save(cols[i],dtype[i],arr)
+        out[i] = arr
+    return out
+
+def _cache(fname,strata):
+    fopts = opts['files'].get(fname,{})
+    tag   = dict(fopts)
+    if opts['sample']!=None: tag['sample'] = dict(opts['sample'],strata=strata)
+    return ColumnCache(opts['cache'],fopts.get('path',fname),os.path.basename(fname),tag if tag else None)
+
+def _is_sorted(x):
+    if x.dtype.kind not in 'fiu': return False
+    for start in range(0,len(x),CHUNK):
+        seg = x[start:start+CHUNK+1]
+        if not (seg[1:]>=seg[:-1]).all(): return False
+    return True
+
+def _select_range(dat,xcol,xmin,xmax,presorted):
+    # The rows with xmin <= x <= xmax by binary search when x is sorted, slices
+    # of memory-mapped columns touch only the window. Otherwise by a mask which
+    # keeps NaN values
+    x = dat[xcol]
+    if presorted or _is_sorted(x):
+        lo = 0 if xmin==None else int(numpy.searchsorted(x,xmin,'left'))
+        hi = len(x) if xmax==None else int(numpy.searchsorted(x,xmax,'right'))
+        return [arr[lo:hi] for arr in dat]
+    keep = numpy.ones(len(x),dtype=bool)
+    if xmin!=None: keep &= ~(x<xmin)
+    if xmax!=None: keep &= ~(x>xmax)
+    return dat if keep.all() else [arr[keep] for arr in dat]
+
+def read_range(fname,cols,dtype=float,xcol=0,xmin=None,xmax=None,presorted=False,strata=None):
+    """
+    read_cols() of the rows with xmin <= x <= xmax, x is the column cols[xcol].
+    With `presorted` the file is declared sorted by x: text files not in the
+    cache are read only up to xmax and are not cached. Cached, binary and
+    columnar data are checked for sortedness unless declared, and the range is
+    found by binary search.
+    """
+    if type(dtype)!=list: dtype = [dtype]*len(cols)
+    if xmin==None and xmax==None: return read_cols(fname,cols,dtype,strata)
+    if presorted and _needs_parsing(fname,cols,dtype,strata):
+        return _parse_cols(fname,cols,dtype,strata,(cols[xcol],xmin,xmax))
+    return _select_range(read_cols(fname,cols,dtype,strata),xcol,xmin,xmax,presorted)
+
+def _needs_parsing(fname,cols,dtype,strata):
+    # text files not in the cache yet
+    if fname in opts['arrays'] or is_binary(fname): return False
+    if is_columnar(opts['files'].get(fname,{}).get('path',fname)): return False
+    if opts['cache']==None: return True
+    if not os.path.exists(os.path.join(opts['cache'],os.path.basename(fname)+'.cache.json')): return True
+    cache = _cache(fname,strata)
+    return not all([cache.has(col,kind) for col,kind in zip(cols,dtype)])
+
+def _read_cols_job(args):
+    # runs in a worker, with the cache the columns are passed back through it
+    # unless only the x-range of a sorted file was read
+    fname,cols,dtype,strata,xrange = args
+    if xrange!=None: return read_range(fname,cols,dtype,*xrange,strata=strata)
+    out = read_cols(fname,cols,dtype,strata)
+    return None if opts['cache']!=None else out
+
+def read_files(fnames,cols,dtype=float,strata=None,xcol=0,xmin=None,xmax=None,presorted=False):
+    """
+    read_cols() of each of `fnames`, or read_range() when xmin or xmax is
+    given; returns the lists of arrays in the same order. Text files are parsed
+    in parallel by forked worker processes; with the cache enabled the workers
+    only fill it and the columns are then memory-mapped from the page cache
+    shared with the workers, otherwise they are sent back pickled.
+    """
+    if type(dtype)!=list: dtype = [dtype]*len(cols)
+    ranged = xmin!=None or xmax!=None
+    todo = [x for x in dict.fromkeys(fnames) if _needs_parsing(x,cols,dtype,strata)]
+    size = sum([os.path.getsize(opts['files'].get(x,{}).get('path',x)) for x in todo])
+    nprocs = min(len(todo),opts['procs'] or os.cpu_count() or 1)
+    parsed = {}
+    if nprocs>1 and size>=PARALLEL_MIN_BYTES and 'fork' in multiprocessing.get_all_start_methods():
+        # fork: the workers inherit the options and do not re-import the template
+        xrange = (xcol,xmin,xmax,presorted) if ranged and presorted else None
+        with ProcessPoolExecutor(nprocs,mp_context=multiprocessing.get_context('fork')) as pool:
+            res = pool.map(_read_cols_job,[(x,cols,dtype,strata,xrange) for x in todo])
+            parsed = { x:dat for x,dat in zip(todo,res) if dat!=None }
+        if ranged and not presorted:
+            parsed = { x:_select_range(dat,xcol,xmin,xmax,presorted) for x,dat in parsed.items() }
+    return [parsed[x] if x in parsed else read_range(x,cols,dtype,xcol,xmin,xmax,presorted,strata) for x in fnames]
+
+def _array_cols(fname,cols,dtype):
+    arrs = opts['arrays'][fname]
+    for col in cols:
+        if col>=len(arrs): raise ValueError('Could not get %d-th column of %s, only %d columns given' % (col+1,fname,len(arrs)))
+    return [numpy.asarray(arrs[col]).astype(kind) for col,kind in zip(cols,dtype)]
+
+def _map_fields(fname,fopts,cols,strata):
+    # template columns -> columns of the file selected by -f
+    if 'fields' not in fopts: return cols,strata
+    fields = fopts['fields']
+    for col in cols:
+        if col>=len(fields): raise ValueError('Could not parse %d-th column in %s, only %d fields selected' % (col+1,fname,len(fields)))
+    return [fields[col] for col in cols],(fields[strata] if strata!=None else None)
+
+def is_columnar(fname):
+    """Parquet or Arrow IPC file, by the magic bytes; arrow.py and pyarrow are imported only to read these"""
+    try:
+        with open(fname,'rb') as fh: hdr = fh.read(6)
+    except OSError:
+        return False
+    return hdr[:4] in (b'PAR1',b'FEA1') or hdr==b'ARROW1'
+
+def _columnar_cols(fname,cols,dtype,strata):
+    fopts = opts['files'].get(fname,{})
+    fname = fopts.get('path',fname)
+    cols,strata = _map_fields(fname,fopts,cols,strata)
+    from mplotlib import arrow
+    return arrow.read_cols(fname,cols,dtype,fopts.get('filters'),opts['sample'],strata)
+
+def is_binary(fname):
+    fopts = opts['files'].get(fname,{})
+    return 'raw' in fopts or binary.is_npy(fopts.get('path',fname))
+
+def read_matrix(fname):
+    """The whole binary array `fname` memory-mapped, one row per record"""
+    fopts = opts['files'].get(fname,{})
+    return binary.open_array(fopts.get('path',fname),fopts.get('raw'))
+
+def _binary_cols(fname,cols,dtype,strata):
+    fopts = opts['files'].get(fname,{})
+    fname = fopts.get('path',fname)
+    cols,strata = _map_fields(fname,fopts,cols,strata)
+    return binary.read_cols(fname,cols,dtype,fopts.get('raw'),fopts.get('filters'),opts['sample'],strata)
+
+def _text_blocks(fh,delim,filters,xrange):
+    blocks = _data_blocks(fh)
+    if filters: blocks = _filter_blocks(blocks,delim,filters)
+    if xrange!=None: blocks = _range_blocks(blocks,delim,*xrange)
+    return blocks
+
+def read_chunks(fname,cols,dtype=float,strata=None):
+    """
+    read_cols() in chunks of rows, yields lists of arrays in the order of
+    `cols`. Text files not in the cache are parsed block by block and are not
+    cached, the memory does not grow with the size of the file. The other
+    sources, and all files when sampling, are read by read_cols() and sliced.
+    """
+    if type(dtype)!=list: dtype = [dtype]*len(cols)
+    if opts['sample']!=None or not _needs_parsing(fname,cols,dtype,strata):
+        dat = read_cols(fname,cols,dtype,strata)
+        for start in range(0,len(dat[0]),CHUNK): yield [arr[start:start+CHUNK] for arr in dat]
+        return
+    fopts   = opts['files'].get(fname,{})
+    fname   = fopts.get('path',fname)
+    delim   = fopts.get('delim','\t')
+    cols    = _map_fields(fname,fopts,cols,None)[0]
+    with bgzf.open_text(fname,opts['threads']) as fh:
+        for lines in _text_blocks(fh,delim,fopts.get('filters'),None):
+            if not lines: continue
+            out = [None]*len(cols)
+            for kind in dict.fromkeys(dtype):
+                idx = [i for i in range(len(cols)) if dtype[i]==kind]
+                for i,arr in zip(idx,_loadtxt(lines,[cols[i] for i in idx],kind,delim)): out[i] = arr
+            yield out
+
+def read_table(fname,dtype=float):
+    """
+    All fields of a text file as a 2D array with one row per line, for the
+    row-oriented inputs. Comments and blank lines are skipped as in read_cols(),
+    the file is parsed in one pass and is not cached nor sampled.
+    """
+    if fname in opts['arrays']: return numpy.column_stack(opts['arrays'][fname]).astype(dtype)
+    fopts = opts['files'].get(fname,{})
+    fname = fopts.get('path',fname)
+    delim = fopts.get('delim','\t')
+    with bgzf.open_text(fname,opts['threads']) as fh:
+        lines = itertools.chain.from_iterable(_text_blocks(fh,delim,fopts.get('filters'),None))
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')     # empty input
+            return numpy.loadtxt(lines,delimiter=delim,comments=None,usecols=fopts.get('fields'),dtype=dtype,ndmin=2)
+
+def _parse_cols(fname,cols,dtype,strata,xrange=None):
+    # Columns of different types are read in separate passes, all done by the
+    # numpy C parser. The sample is drawn anew in each pass, the same seed picks
+    # the same rows. With xrange=(col,xmin,xmax) the file is sorted by col and
+    # only the range is read
+    fopts   = opts['files'].get(fname,{})
+    fname   = fopts.get('path',fname)
+    delim   = fopts.get('delim','\t')
+    filters = fopts.get('filters')
+    cols,strata = _map_fields(fname,fopts,cols,strata)
+    if xrange!=None: xrange = (_map_fields(fname,fopts,[xrange[0]],None)[0][0],) + tuple(xrange[1:])
+    out = [None]*len(cols)
+    for kind in dict.fromkeys(dtype):
+        idx = [i for i in range(len(cols)) if dtype[i]==kind]
+        with bgzf.open_text(fname,opts['threads']) as fh:
+            blocks = _text_blocks(fh,delim,filters,xrange)
+            if opts['sample']!=None:
+                lines = sample.sample_lines(blocks,opts['sample']['size'],opts['sample']['seed'],strata,delim)
+            else:
+                lines = itertools.chain.from_iterable(blocks)
+            dat = _loadtxt(lines,[cols[i] for i in idx],kind,delim)
+        for i,arr in zip(idx,dat): out[i] = arr
+    return out
+
+def group_by(keys,vals):
+    """
+    Split `vals` into groups defined by the corresponding `keys`. Returns a dict
+    of arrays, ordered by the first appearance of each key.
+    """
+    uniq,first,inv = numpy.unique(keys,return_index=True,return_inverse=True)
+    inv   = inv.reshape(-1)
+    cnts  = numpy.bincount(inv,minlength=len(uniq))
+    parts = numpy.split(vals[numpy.argsort(inv,kind='stable')],numpy.cumsum(cnts)[:-1])
+    return { uniq[i].item():parts[i] for i in numpy.argsort(first) }
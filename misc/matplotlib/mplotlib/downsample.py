@@ -0,0 +1,89 @@
+#
+# Downsampling of long lines to the pixel resolution of the output (mplot +ds)
+#
+# A line of millions of points drawn into a few thousand pixel columns is slow
+# to render and can exceed the Agg path limits. The SAVE block of the generated
+# plot.py calls downsample_lines() before saving: the data of each long line is
+# replaced by a subset which draws the same picture,
+#   minmax .. in each pixel column the first, last, minimum and maximum point;
+#             visually lossless, the default
+#   lttb   .. Largest-Triangle-Three-Buckets, two points per pixel column; keeps
+#             the shape, not every spike
+# Only lines without markers and with x sorted are reduced, the pixel columns
+# are those of the final axis limits and scale at the savefig dpi.
+#
+
+import numpy
+import matplotlib
+
+methods = ['minmax','lttb']
+
+def _npixels(ax,dpi):
+    return max(1,int(round(ax.get_position().width * ax.figure.get_figwidth() * dpi)))
+
+def minmax(x,y,xmin,xmax,npix,scale=None):
+    """
+    Indexes of the first, last, minimum and maximum point in each of `npix`
+    columns between xmin and xmax; points outside fall into one column on each
+    side. `x` must be sorted, `scale` maps x to the axis scale (log, ..)
+    """
+    xt = x if scale==None else scale(x)
+    if scale!=None: xmin,xmax = scale(numpy.array([xmin,xmax]))
+    pix = numpy.floor((xt - xmin)*(npix/float(xmax-xmin)))
+    pix = numpy.clip(numpy.nan_to_num(pix),-1,npix).astype(numpy.int32) + 1
+    start = numpy.concatenate([[0],numpy.flatnonzero(pix[1:]!=pix[:-1])+1])
+    end   = numpy.concatenate([start[1:]-1,[len(x)-1]])
+    ymin  = numpy.full(npix+2,numpy.nan)
+    ymax  = numpy.full(npix+2,numpy.nan)
+    ymin[pix[start]] = numpy.fmin.reduceat(y,start)
+    ymax[pix[start]] = numpy.fmax.reduceat(y,start)
+    idx = [start,end]
+    for ext in (ymin,ymax):
+        hit = numpy.flatnonzero(y==ext[pix])
+        first = numpy.concatenate([[True],pix[hit[1:]]!=pix[hit[:-1]]]) if len(hit) else []
+        idx.append(hit[first])
+    return numpy.unique(numpy.concatenate(idx))
+
+def lttb(x,y,n):
+    """Indexes of `n` points chosen by Largest-Triangle-Three-Buckets"""
+    if n>=len(x) or n<3: return numpy.arange(len(x))
+    edges = numpy.linspace(1,len(x)-1,n-1).astype(int)
+    out = numpy.empty(n,dtype=int)
+    out[0],out[-1] = 0,len(x)-1
+    a = 0
+    for i in range(n-2):
+        lo,hi = edges[i],edges[i+1]
+        if i+2<len(edges): nlo,nhi = edges[i+1],edges[i+2]
+        else: nlo,nhi = len(x)-1,len(x)
+        cx,cy = x[nlo:nhi].mean(),y[nlo:nhi].mean()
+        area = numpy.abs((x[a]-cx)*(y[lo:hi]-y[a]) - (x[a]-x[lo:hi])*(cy-y[a]))
+        a = lo + int(numpy.argmax(area))
+        out[i+1] = a
+    return out
+
+def downsample_lines(fig,method='minmax',dpi=None,threshold=4):
+    """
+    Reduce the lines of `fig` with more than `threshold` points per pixel column
+    of their axes, `dpi` defaults to the savefig dpi
+    """
+    if not method or method=='0': return
+    if method not in methods: raise ValueError('Unknown +ds method "%s", choose from %s' % (method,','.join(methods)))
+    if dpi==None:
+        dpi = matplotlib.rcParams['savefig.dpi']
+        if dpi=='figure': dpi = fig.dpi
+    for ax in fig.axes:
+        npix = _npixels(ax,dpi)
+        for line in ax.lines:
+            if line.get_marker() not in (None,'None','',' ') or line.get_linestyle() in ('None','',' '): continue
+            if len(line.get_xdata()) <= threshold*npix: continue
+            xy  = line.get_xydata()       # converted from units (dates, ..)
+            x,y = xy[:,0],xy[:,1]
+            if not (x[1:]>=x[:-1]).all(): continue
+            if method=='minmax':
+                xmin,xmax = ax.get_xlim()
+                scale = None
+                if ax.get_xscale()!='linear': scale = ax.xaxis.get_transform().transform
+                idx = minmax(x,y,min(xmin,xmax),max(xmin,xmax),npix,scale)
+            else:
+                idx = lttb(x,y,2*npix)
+            line.set_data(x[idx],y[idx])
@@ -0,0 +1,86 @@
+#
+# Report the cold-start import cost of the templates
+#
+#   importtime.py                       # all templates
+#   importtime.py -b 800 xy.py box.py   # exit with an error if a template exceeds 800ms
+#
+# The module-level imports of each template are executed in a fresh interpreter
+# with `python -X importtime`, imports deferred to the code paths which need
+# them are not counted. Templates which cannot be parsed are reported as such.
+#
+
+import os,sys,ast,time,argparse,subprocess
+
+def template_imports(fname):
+    """Returns the source of the module-level import statements of a template"""
+    with open(fname) as fh: tree = ast.parse(fh.read(),fname)
+    out = []
+    for node in tree.body:
+        if isinstance(node,(ast.Import,ast.ImportFrom)): out.append(ast.unparse(node))
+    return out
+
+def run_importtime(python,code,dir):
+    """Returns the wall time and the list of top-level imports with their cumulative times in ms"""
+    start = time.time()
+    proc  = subprocess.run([python,'-X','importtime','-c',code],cwd=dir,capture_output=True,text=True)
+    wall  = time.time() - start
+    if proc.returncode!=0: raise RuntimeError(proc.stderr.strip().split('\n')[-1])
+
+    # import time: self [us] | cumulative | imported package
+    mods = []
+    for line in proc.stderr.split('\n'):
+        if not line.startswith('import time:'): continue
+        cols = line[len('import time:'):].split('|')
+        if len(cols)!=3 or not cols[1].strip().isdigit(): continue
+        name = cols[2][1:]
+        if name.startswith(' '): continue   # nested import
+        mods.append((name,int(cols[1])/1000.))
+    return wall*1000,mods
+
+def measure(fname,python,startup):
+    """
+    Returns the wall time, the total import time and the top-level imports with
+    their cumulative times. Modules loaded by the interpreter itself (`startup`)
+    are not counted.
+    """
+    dir  = os.path.dirname(os.path.abspath(fname))
+    code = 'import sys\nsys.path.insert(0,%r)\n' % dir + '\n'.join(template_imports(fname)) + '\n'
+    wall,mods = run_importtime(python,code,dir)
+    mods  = [x for x in mods if x[0] not in startup]
+    total = sum([x[1] for x in mods])
+    return wall,total,sorted(mods,key=lambda x:x[1],reverse=True)
+
+def main():
+    tmpl_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    parser = argparse.ArgumentParser(description='Import time of mplot templates')
+    parser.add_argument('-b','--budget',type=float,help='maximum import time in ms')
+    parser.add_argument('-e','--exec',default=sys.executable,help='python executable [%(default)s]')
+    parser.add_argument('-n','--top',type=int,default=3,help='number of the most expensive imports to list [%(default)s]')
+    parser.add_argument('templates',nargs='*',help='templates to check [all in %s]' % tmpl_dir)
+    args = parser.parse_args()
+
+    templates = args.templates
+    if not templates: templates = sorted([os.path.join(tmpl_dir,x) for x in os.listdir(tmpl_dir) if x.endswith('.py')])
+
+    startup = set([x[0] for x in run_importtime(args.exec,'import sys',tmpl_dir)[1]])
+    nover = 0
+    print('# [1]Template\t[2]Imports [ms]\t[3]Wall incl. interpreter [ms]\t[4]Most expensive imports [ms]')
+    for fname in templates:
+        name = os.path.basename(fname)
+        try:
+            wall,total,mods = measure(fname,args.exec,startup)
+        except SyntaxError:
+            print('%s\t-\t-\tcannot parse' % name)
+            continue
+        except RuntimeError as e:
+            print('%s\t-\t-\t%s' % (name,e))
+            continue
+        top = ','.join(['%s:%.0f' % x for x in mods[:args.top]])
+        print('%s\t%.0f\t%.0f\t%s' % (name,total,wall,top))
+        if args.budget!=None and total > args.budget: nover += 1
+    if nover:
+        print('%d template(s) over the budget of %.0fms' % (nover,args.budget),file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
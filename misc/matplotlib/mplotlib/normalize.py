@@ -0,0 +1,45 @@
+#
+# Normalization of curves (mplot +norm)
+#
+#   max=K    .. scale so that the maximum is K
+#   sum=K    .. scale so that the values sum to K
+#   dnsity=K .. as sum=K, then divide by the width of the x-interval of each
+#               point, to the next point; the last point takes the width of
+#               the previous interval
+#   area=K   .. scale so that the area under the curve, the sum of the values
+#               weighted by their x-intervals, is K
+#   cum=K    .. the cumulative sum, scaled to end at K
+# The operations are on whole arrays, NaN values are ignored in the totals.
+#
+
+import numpy
+
+modes = ['max','sum','dnsity','area','cum']
+
+def parse(spec):
+    """Split the +norm value "mode=K" into the mode and the float K, K defaults to 1"""
+    mode,_,scale = str(spec).partition('=')
+    if mode not in modes: raise ValueError('Unknown +norm mode "%s", choose from %s' % (mode,','.join(modes)))
+    return mode,float(scale) if scale!='' else 1.
+
+def intervals(x):
+    """The width of the x-interval of each point, see dnsity above"""
+    x = numpy.asarray(x,dtype=numpy.float64)
+    if len(x)<2: return numpy.ones(len(x))
+    dx = numpy.empty(len(x))
+    dx[:-1] = numpy.diff(x)
+    dx[-1]  = dx[-2]
+    return dx
+
+def normalize(x,y,mode='max',scale=1.):
+    """Return `y` normalized by `mode` as a new float array, `x` is needed by dnsity and area only"""
+    y = numpy.asarray(y,dtype=numpy.float64)
+    if not len(y): return y
+    if mode=='max': return y*(scale/numpy.nanmax(y))
+    if mode=='sum': return y*(scale/numpy.nansum(y))
+    if mode=='dnsity': return y*(scale/numpy.nansum(y))/intervals(x)
+    if mode=='area': return y*(scale/numpy.nansum(y*intervals(x)))
+    if mode=='cum':
+        cum = numpy.nancumsum(y)
+        return cum*(scale/cum[-1])
+    raise ValueError('Unknown +norm mode "%s", choose from %s' % (mode,','.join(modes)))
@@ -0,0 +1,100 @@
+#
+# Per-phase profile of a plot (mplot +prof)
+#
+# The generated plot.py calls start() first thing and finish() after the SAVE
+# block. The time is split into phases without changes to the templates:
+#   import   .. imports of modules
+#   read     .. the shared column reader, mplotlib.data.read_cols
+#   draw     .. matplotlib calls creating the artists, see draw_methods
+#   render   .. downsampling, aggregation and rasterization of the artists in the
+#               SAVE block
+#   save.fmt .. savefig of each output format
+#   compute  .. everything else: parsing in templates which do not use the shared
+#               reader, statistics, binning, ..
+# For each phase the wall time, the number of calls and how much the peak RSS
+# grew during the phase are written as JSON. Optionally the whole render is also
+# profiled with cProfile.
+#
+
+import sys,time,json,atexit,functools,resource
+
+draw_methods = ['plot','scatter','bar','barh','hist','hist2d','hexbin','imshow','matshow','pcolor','pcolormesh',
+    'contour','contourf','fill','fill_between','fill_betweenx','errorbar','step','stem','stackplot','pie','boxplot',
+    'violinplot','vlines','hlines','axhline','axvline','axhspan','axvspan','broken_barh','loglog','semilogx','semilogy',
+    'text','annotate','legend','add_patch','add_collection','add_line']
+
+state = None
+
+def _maxrss():
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform=='darwin': rss //= 1024     # bytes on mac, kB elsewhere
+    return rss
+
+class phase:
+    """Context manager timing a phase, nested phases count to the outermost one"""
+    def __init__(self,name):
+        self.name = name
+    def __enter__(self):
+        if state==None: return self
+        state['depth'] += 1
+        if state['depth']==1: self.start,self.rss = time.time(),_maxrss()
+        return self
+    def __exit__(self,*args):
+        if state==None: return False
+        state['depth'] -= 1
+        if state['depth']==0:
+            rec = state['phases'].setdefault(self.name,{'wall':0,'calls':0,'maxrss_growth_kb':0})
+            rec['wall']  += time.time() - self.start
+            rec['calls'] += 1
+            rec['maxrss_growth_kb'] += _maxrss() - self.rss
+        return False
+
+def _timed(func,name):
+    @functools.wraps(func)
+    def wrapper(*args,**kwargs):
+        with phase(name): return func(*args,**kwargs)
+    return wrapper
+
+def _patch(obj,name,phase_name):
+    orig = obj.__dict__.get(name)       # None when inherited
+    setattr(obj,name,_timed(getattr(obj,name),phase_name))
+    state['patched'].append((obj,name,orig))
+
+def start(fname,pstats=None):
+    """Start profiling, the results are written to `fname` by finish()"""
+    global state
+    if state!=None: finish()
+    state = {'fname':fname,'pstats':pstats,'start':time.time(),'depth':0,'phases':{},'patched':[],'cprofile':None}
+
+    import builtins
+    _patch(builtins,'__import__','import')
+    from matplotlib.axes import Axes
+    for name in draw_methods:
+        if hasattr(Axes,name): _patch(Axes,name,'draw')
+    from mplotlib import data
+    _patch(data,'read_cols','read')
+
+    if pstats!=None:
+        import cProfile
+        state['cprofile'] = cProfile.Profile()
+        state['cprofile'].enable()
+    atexit.register(finish)
+
+def finish():
+    """Stop profiling and write the results"""
+    global state
+    if state==None: return
+    prof,state = state,None
+    wall = time.time() - prof['start']
+    if prof['cprofile']!=None:
+        prof['cprofile'].disable()
+        prof['cprofile'].dump_stats(prof['pstats'])
+    for obj,name,orig in reversed(prof['patched']):
+        if orig==None: delattr(obj,name)
+        else: setattr(obj,name,orig)
+
+    phases = prof['phases']
+    phases['compute'] = {'wall':max(0,wall-sum([x['wall'] for x in phases.values()]))}
+    out = {'script':sys.argv[0],'total':{'wall':wall,'maxrss_kb':_maxrss()},'phases':phases}
+    if prof['pstats']!=None: out['cprofile'] = prof['pstats']
+    with open(prof['fname'],'w') as fh: json.dump(out,fh,indent=1,sort_keys=True)
@@ -0,0 +1,26 @@
+#
+# Rasterize dense layers in vector outputs
+#
+# A scatter plot of millions of points written as pdf or svg is huge, slow to
+# write and crashes viewers. The SAVE block of the generated plot.py calls
+# rasterize_dense() before writing a vector format: collections and lines with
+# many points are then embedded as images at the savefig dpi, while the axes,
+# text and legends stay vector.
+#
+
+from matplotlib.collections import Collection
+from matplotlib.lines import Line2D
+
+def npoints(artist):
+    """Number of points drawn by a line or a collection"""
+    if isinstance(artist,Line2D): return len(artist.get_xydata())
+    n = len(artist.get_offsets())
+    if n>1: return n
+    return sum([len(path.vertices) for path in artist.get_paths()])
+
+def rasterize_dense(fig,threshold):
+    """Rasterize the lines and collections of `fig` with more than `threshold` points"""
+    if not threshold: return
+    for ax in fig.axes:
+        for artist in list(ax.lines) + list(ax.collections):
+            if npoints(artist) > threshold: artist.set_rasterized(True)
@@ -0,0 +1,79 @@
+#
+# Execute generated plot.py scripts inside an already running interpreter, used
+# by the render server and the batch mode to avoid paying the python and
+# matplotlib startup for every plot. Parameter files plot.json (mplot --json)
+# are run by the template module, which keeps the compiled templates in memory
+#
+
+import os,sys,runpy,traceback
+import matplotlib as mpl
+mpl.use('Agg')
+import matplotlib.pyplot as plt
+from mplotlib import template
+
+# modules commonly needed by the templates
+preload_modules = ['numpy','matplotlib.pyplot','matplotlib.gridspec','matplotlib.patches','scipy.stats','scipy.spatial.distance','fastcluster','sklearn.manifold']
+
+def preload(modules):
+    """Import the listed modules, silently skipping those not installed"""
+    for mod in modules:
+        try:
+            __import__(mod)
+        except ImportError:
+            pass
+
+def reset():
+    from mplotlib import data
+    data.reset_opts()
+    plt.close('all')
+    mpl.rcdefaults()
+    mpl.use('Agg')
+
+def run_captured(script,cwd,fd):
+    """Same as run_script() but with stdout and stderr redirected to the file descriptor `fd`"""
+    sys.stdout.flush()
+    sys.stderr.flush()
+    saved = [os.dup(1),os.dup(2)]
+    os.dup2(fd,1)
+    os.dup2(fd,2)
+    try:
+        return run_script(script,cwd)
+    finally:
+        os.dup2(saved[0],1)
+        os.dup2(saved[1],2)
+        os.close(saved[0])
+        os.close(saved[1])
+
+def run_script(script,cwd=None):
+    """
+    Run the plot.py script, or the template with the parameters in plot.json,
+    as if it was executed from the command line in the directory `cwd`. Returns
+    the exit status.
+    """
+    reset()
+    old_cwd  = os.getcwd()
+    old_argv = sys.argv
+    old_path = list(sys.path)
+    status = 0
+    try:
+        if cwd!=None: os.chdir(cwd)
+        sys.argv = [script]
+        if script.endswith('.json'): template.run_json(script)
+        else: runpy.run_path(script,run_name='__main__')
+    except SystemExit as e:
+        if e.code==None: status = 0
+        elif isinstance(e.code,int): status = e.code
+        else:
+            print(e.code,file=sys.stderr)
+            status = 1
+    except BaseException:
+        traceback.print_exc()
+        status = 1
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os.chdir(old_cwd)
+        sys.argv = old_argv
+        sys.path[:] = old_path
+        reset()
+    return status
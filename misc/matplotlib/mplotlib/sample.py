@@ -0,0 +1,97 @@
+#
+# Seeded random sampling of data lines in a single pass (mplot -s)
+#
+# The reservoir uses Li's algorithm L: the gaps between successive replacements
+# are drawn directly, so the lines which are skipped cost nothing and only about
+# size*log(n/size) random numbers are needed. The sample depends only on the seed
+# and on the input, the reader can therefore repeat a pass and get the same rows.
+#
+
+import math
+import numpy
+
+class Reservoir:
+    """Uniform random sample of at most `size` lines"""
+    def __init__(self,size,rng):
+        self.size  = size
+        self.rng   = rng
+        self.lines = []
+        self.index = []
+        self.skip  = 0
+        self.w     = 1.
+
+    def _draw(self):
+        self.w   *= math.exp(math.log(1-self.rng.random())/self.size)
+        self.skip = int(math.log(1-self.rng.random())/math.log1p(-self.w))
+
+    def add(self,lines,start):
+        """Offer a block of `lines`, numbered from `start` in the input"""
+        i = 0
+        if len(self.lines)<self.size:
+            i = min(self.size-len(self.lines),len(lines))
+            self.lines.extend(lines[:i])
+            self.index.extend(range(start,start+i))
+            if len(self.lines)<self.size: return
+            self._draw()
+        while True:
+            i += self.skip
+            if i>=len(lines):
+                self.skip = i - len(lines)
+                return
+            j = self.rng.integers(self.size)
+            self.lines[j] = lines[i]
+            self.index[j] = start + i
+            i += 1
+            self._draw()
+
+def sample_lines(blocks,size,seed,strata=None,delim=None):
+    """
+    Returns a random sample of `size` lines from the blocks of lines, in the
+    input order. With `strata` set to a column index, up to `size` lines are
+    sampled from each group of lines sharing the value in that column so that
+    small groups are kept whole.
+    """
+    rng = numpy.random.default_rng(seed)
+    if strata==None:
+        res = Reservoir(size,rng)
+        n = 0
+        for lines in blocks:
+            res.add(lines,n)
+            n += len(lines)
+        groups = [res]
+    else:
+        groups = {}
+        n = 0
+        for lines in blocks:
+            for line in lines:
+                vals = line.strip().split(delim)
+                key  = vals[strata] if strata<len(vals) else ''
+                if key not in groups: groups[key] = Reservoir(size,rng)
+                groups[key].add([line],n)
+                n += 1
+        groups = list(groups.values())
+    if not groups: return []
+    index = numpy.concatenate([numpy.asarray(x.index,dtype=int) for x in groups])
+    lines = [line for x in groups for line in x.lines]
+    return [lines[i] for i in numpy.argsort(index,kind='stable')]
+
+def sample_index(n,size,seed,keys=None):
+    """
+    Row indexes of a random sample of `size` out of `n` rows, sorted. With `keys`
+    the rows are sampled per group as in sample_lines(), for inputs which are
+    not read line by line.
+    """
+    rng = numpy.random.default_rng(seed)
+    if keys is None:
+        groups = [numpy.arange(n)]
+    else:
+        uniq,first,inv = numpy.unique(keys,return_index=True,return_inverse=True)
+        inv    = inv.reshape(-1)
+        groups = numpy.split(numpy.argsort(inv,kind='stable'),numpy.cumsum(numpy.bincount(inv))[:-1])
+        groups = [groups[i] for i in numpy.argsort(first)]
+    index = []
+    for rows in groups:
+        res = Reservoir(size,rng)
+        res.add(rows,0)
+        index.extend(res.lines)
+    return numpy.sort(numpy.asarray(index,dtype=int))
@@ -0,0 +1,89 @@
+#
+# Long-lived render server, keeps matplotlib and friends imported and renders
+# the plot.py scripts submitted by mplot over a local unix socket
+#
+#   mplot --server &
+#   mplot xy -o img.png dat.txt       # rendered by the server when it runs
+#
+# Each job is run in a forked copy of the warm process so that the templates
+# cannot leak state from one plot to the next. The protocol is one json line
+# per connection in each direction:
+#   request:  {"script":"/abs/path/plot.py","cwd":"/abs/path"}
+#   response: {"status":0,"output":"..","time":0.12}
+#
+
+import os,sys,json,time,stat,signal,socket,socketserver,tempfile,argparse
+
+if __package__ in (None,''):
+    sys.path.insert(0,os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from mplotlib import render
+
+def default_socket():
+    if 'MPLOT_SOCKET' in os.environ: return os.environ['MPLOT_SOCKET']
+    if 'XDG_RUNTIME_DIR' in os.environ: return os.path.join(os.environ['XDG_RUNTIME_DIR'],'mplot-%d.sock' % os.getuid())
+    # in the shared temporary directory the socket is kept in a private directory
+    return os.path.join(tempfile.gettempdir(),'mplot-%d' % os.getuid(),'mplot.sock')
+
+def private_dir(dir):
+    """Create `dir` accessible only by the user, exit if it exists and others could enter it"""
+    if not os.path.lexists(dir): os.mkdir(dir,0o700)
+    st = os.lstat(dir)
+    if not stat.S_ISDIR(st.st_mode) or st.st_uid!=os.getuid() or stat.S_IMODE(st.st_mode)!=0o700:
+        sys.exit('The socket directory must be owned by the user with permissions 0700: '+dir)
+
+class Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        job = json.loads(self.rfile.readline())
+        start = time.time()
+
+        # capture everything the script prints, including output of subprocesses
+        out = tempfile.TemporaryFile()
+        status = render.run_captured(job['script'],job.get('cwd'),out.fileno())
+        out.seek(0)
+        output = out.read().decode(errors='replace')
+
+        reply = {'status':status,'output':output,'time':time.time()-start}
+        self.wfile.write((json.dumps(reply)+'\n').encode())
+
+class Server(socketserver.ForkingMixIn,socketserver.UnixStreamServer):
+    pass
+
+def is_running(path):
+    sock = socket.socket(socket.AF_UNIX,socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+        return True
+    except OSError:
+        return False
+    finally:
+        sock.close()
+
+def main():
+    parser = argparse.ArgumentParser(description='Render server for mplot')
+    parser.add_argument('-s','--socket',default=default_socket(),help='unix socket to listen on [%(default)s]')
+    parser.add_argument('-p','--preload',default=','.join(render.preload_modules),help='comma-separated modules to import at startup')
+    args = parser.parse_args()
+
+    # mplot connects only to a socket in a private directory unless its location is set
+    dir = os.path.dirname(os.path.abspath(args.socket))
+    if not os.path.isdir(dir) or not ('MPLOT_SOCKET' in os.environ or 'XDG_RUNTIME_DIR' in os.environ): private_dir(dir)
+    if os.path.exists(args.socket):
+        if is_running(args.socket): sys.exit('The server is already running: '+args.socket)
+        os.unlink(args.socket)
+    render.preload(args.preload.split(','))
+
+    def terminate(signum,frame): raise KeyboardInterrupt
+    signal.signal(signal.SIGTERM,terminate)
+
+    server = Server(args.socket,Handler)
+    print('Listening on '+args.socket,file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        os.unlink(args.socket)
+
+if __name__ == '__main__':
+    main()
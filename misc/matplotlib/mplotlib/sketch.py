@@ -0,0 +1,162 @@
+#
+# Streaming quantiles with bounded memory (KLL sketch)
+#
+# The values are kept exactly up to `exact` values, then summarized by a KLL
+# sketch (Karnin, Lang, Liberty 2016): a stack of compactors where level h holds
+# sorted items of weight 2^h. A full level is sorted and every other item, from
+# a random offset, is promoted to the next level. The capacity of the levels
+# decreases geometrically (factor 2/3) from the top one of capacity k, so the
+# memory is O(k) items plus O(log n) levels whatever the number of values.
+#
+# Rank error: the returned quantile q has a true rank within q +- eps with
+# eps ~ 1.33% for k=200 at 99% confidence (the KLL bounds as tabulated by
+# Apache DataSketches), decreasing roughly as 1/k, i.e. ~0.7% for the default
+# k=400. Sketches of the same k can be merged, e.g. the same group from several
+# files.
+#
+
+import numpy
+
+CHUNK = 1<<20
+
+class Quantiles:
+    """Quantiles of a stream of values, exact up to `exact` values"""
+    def __init__(self,k=400,exact=1000000,seed=0):
+        self.k      = k
+        self.exact  = exact
+        self.rng    = numpy.random.default_rng(seed)
+        self.n      = 0
+        self.min    = numpy.inf
+        self.max    = -numpy.inf
+        self.buf    = []
+        self.levels = None
+
+    def is_exact(self):
+        return self.levels==None
+
+    def update(self,vals):
+        vals = numpy.asarray(vals,dtype=float)
+        vals = vals[~numpy.isnan(vals)]
+        if not len(vals): return
+        self.n  += len(vals)
+        self.min = min(self.min,vals.min())
+        self.max = max(self.max,vals.max())
+        if self.levels==None:
+            self.buf.append(vals)
+            if self.n<=self.exact: return
+            vals = numpy.concatenate(self.buf)
+            self.buf,self.levels = None,[]
+        self._insert(vals,0)
+
+    def merge(self,other):
+        """Add the values summarized by another sketch"""
+        if other.levels==None:
+            for vals in other.buf: self.update(vals)
+            return
+        if self.levels==None:
+            buf = self.buf
+            self.buf,self.levels = None,[]
+            for vals in buf: self._insert(vals,0)
+        self.n  += other.n
+        self.min = min(self.min,other.min)
+        self.max = max(self.max,other.max)
+        for h in range(len(other.levels)): self._insert(other.levels[h],h)
+
+    def _capacity(self,h):
+        return max(2,int(numpy.ceil(self.k*(2/3.)**(len(self.levels)-h-1))))
+
+    def _insert(self,vals,h):
+        while len(vals):
+            while len(self.levels)<=h: self.levels.append(numpy.empty(0))
+            arr = numpy.concatenate([self.levels[h],vals])
+            if len(arr)<=self._capacity(h):
+                self.levels[h] = arr
+                return
+            arr.sort(kind='stable')
+            odd = len(arr) % 2
+            self.levels[h] = arr[len(arr)-odd:]
+            vals = arr[self.rng.integers(2):len(arr)-odd:2]
+            h += 1
+
+    def weighted(self):
+        """The retained values, sorted, and their weights"""
+        if self.levels==None:
+            vals = self.sorted()
+            return vals,numpy.ones(len(vals))
+        vals = numpy.concatenate(self.levels)
+        wts  = numpy.concatenate([numpy.full(len(x),2.**h) for h,x in enumerate(self.levels)])
+        idx  = numpy.argsort(vals,kind='stable')
+        return vals[idx],wts[idx]
+
+    def sorted(self):
+        """All values sorted, exact mode only"""
+        if self.levels!=None: raise ValueError('The values were summarized, only the sketch is available')
+        return numpy.sort(numpy.concatenate(self.buf)) if self.buf else numpy.empty(0)
+
+    def quantile(self,q):
+        """The value at the quantile `q` (a number or an array) in [0,1]"""
+        if self.levels==None: return numpy.percentile(self.sorted(),numpy.multiply(q,100))
+        vals,wts = self.weighted()
+        cum = numpy.cumsum(wts)
+        idx = numpy.searchsorted(cum,numpy.multiply(q,cum[-1]),side='left')
+        return vals[numpy.clip(idx,0,len(vals)-1)]
+
+    def _trimmed(self,trim):
+        # the retained values between the quantiles trim=(p0,p1) and their weights
+        vals,wts = self.weighted()
+        if trim==None: return vals,wts,self.min,self.max
+        lo,hi = self.quantile(trim)
+        keep = (vals>=lo) & (vals<=hi)
+        return vals[keep],wts[keep],lo,hi
+
+    def summary(self,trim=None,whis=1.5):
+        """
+        Box plot statistics as in matplotlib.cbook.boxplot_stats, of the values
+        between the quantiles trim=(p0,p1) if given
+        """
+        vals,wts,lo,hi = self._trimmed(trim)
+        cum = numpy.cumsum(wts)
+        q1,med,q3 = vals[numpy.clip(numpy.searchsorted(cum,numpy.multiply([0.25,0.5,0.75],cum[-1])),0,len(vals)-1)]
+        iqr = q3 - q1
+        # the most extreme values within whis*iqr, the exact min and max if they qualify
+        inlo = vals[vals>=q1-whis*iqr]
+        inhi = vals[vals<=q3+whis*iqr]
+        whislo = lo if lo>=q1-whis*iqr else (inlo[0] if len(inlo) else q1)
+        whishi = hi if hi<=q3+whis*iqr else (inhi[-1] if len(inhi) else q3)
+        return {'min':lo,'max':hi,'q1':q1,'med':med,'q3':q3,'iqr':iqr,'whislo':whislo,'whishi':whishi,
+                'mean':numpy.sum(vals*wts)/cum[-1],'fliers':numpy.empty(0)}
+
+    def density(self,coords,trim=None):
+        """
+        Gaussian kernel density at `coords` with Scott's bandwidth for the full
+        number of values. The retained values are sparse in the tails, their
+        weights are first spread between the neighbours by interpolating the CDF.
+        """
+        vals,wts,lo,hi = self._trimmed(trim)
+        mean = numpy.sum(vals*wts)/numpy.sum(wts)
+        std  = numpy.sqrt(numpy.sum(wts*(vals-mean)**2)/numpy.sum(wts))
+        bw   = std * self.n**(-1/5.) if std>0 else 1.
+        grid = numpy.linspace(lo,hi,2001)
+        cum  = numpy.cumsum(wts) - 0.5*wts
+        mass = numpy.diff(numpy.interp(grid,vals,cum,left=0,right=cum[-1]))
+        mid  = 0.5*(grid[1:] + grid[:-1])
+        z = (numpy.asarray(coords,dtype=float)[:,None] - mid[None,:])/bw
+        return numpy.exp(-0.5*z*z).dot(mass)/(numpy.sum(mass)*bw*numpy.sqrt(2*numpy.pi))
+
+    def cdf(self,x):
+        """Fraction of the values <= x"""
+        vals,wts = self.weighted()
+        cum = numpy.concatenate([[0],numpy.cumsum(wts)])
+        return cum[numpy.searchsorted(vals,x,side='right')]/cum[-1]
+
+def update_groups(groups,keys,vals,**kwargs):
+    """
+    Add `vals` to the Quantiles in the dict `groups` by the corresponding `keys`,
+    new groups are created with `kwargs`. Large arrays are processed in chunks.
+    """
+    from mplotlib import data
+    for start in range(0,len(vals),CHUNK):
+        for key,part in data.group_by(keys[start:start+CHUNK],vals[start:start+CHUNK]).items():
+            if key not in groups: groups[key] = Quantiles(**kwargs)
+            groups[key].update(part)
+    return groups
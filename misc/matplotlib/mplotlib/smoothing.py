@@ -0,0 +1,97 @@
+#
+# Smoothing of evenly spaced curves (mplot +smooth, +smw)
+#
+# The values are convolved with a normalized window of `width` samples, the ends
+# are padded by reflection. The window and the padding are placed as by the
+# templates' former smooth_data(), the results differ only by rounding: the
+# window of the i-th point spans width-width//2 points before it and width//2-1
+# after it. Windows:
+#   flat        .. moving average, a running sum: O(n) whatever the width
+#   hanning, hamming, bartlett, blackman
+#               .. the numpy windows, the default is hanning
+#   tricube     .. the LOWESS weights; for evenly spaced x the local linear fit
+#                  at the center point is this weighted average
+#   savgol[:k]  .. Savitzky-Golay, the local polynomial fit of order k [2]
+# Short windows are convolved directly, long ones by FFT. The input is processed
+# in chunks which overlap by the window, smooth_chunks() takes any iterable of
+# arrays so that a track can be smoothed while it is being read; the memory is
+# the output plus a chunk.
+#
+
+import numpy
+
+windows = ['flat','hanning','hamming','bartlett','blackman','tricube','savgol']
+CHUNK = 1<<20
+FFT_MIN_WIDTH = 64
+
+def kernel(window,width):
+    """The normalized weights of `window` with `width` samples"""
+    name,_,order = str(window).partition(':')
+    if name not in windows: raise ValueError('Unknown smoothing window "%s", choose from %s' % (window,','.join(windows)))
+    if name=='flat':
+        w = numpy.ones(width)
+    elif name=='tricube':
+        t = numpy.linspace(-1,1,width+2)[1:-1]
+        w = (1 - numpy.abs(t)**3)**3
+    elif name=='savgol':
+        order = int(order) if order!='' else 2
+        if order>=width: raise ValueError('The Savitzky-Golay order must be smaller than the width: %d >= %d' % (order,width))
+        pos = numpy.arange(width) - (width-1)/2.
+        w = numpy.linalg.pinv(numpy.vander(pos,order+1,increasing=True))[0]
+    else:
+        w = getattr(numpy,name)(width)
+    return w/w.sum()
+
+def _convolve(buf,w,flat):
+    # the 'valid' part of the convolution, len(buf)-len(w)+1 values
+    n = len(w)
+    if flat:
+        cum = numpy.concatenate([[0.],numpy.cumsum(buf)])
+        return (cum[n:] - cum[:-n])/n
+    if n < FFT_MIN_WIDTH: return numpy.convolve(buf,w,mode='valid')
+    nfft = 1
+    while nfft < len(buf)+n-1: nfft *= 2
+    full = numpy.fft.irfft(numpy.fft.rfft(buf,nfft)*numpy.fft.rfft(w,nfft),nfft)
+    return full[n-1:len(buf)]
+
+def smooth_chunks(chunks,width,window='hanning'):
+    """
+    Smooth the stream of arrays `chunks`, yields the smoothed values in chunks.
+    The stream must have at least `width` values.
+    """
+    w = kernel(window,width)
+    flat = str(window)=='flat'
+    left = len(w) - len(w)//2
+    right = len(w)-1-left
+    buf = numpy.empty(0)
+    started = False
+    for part in chunks:
+        buf = numpy.concatenate([buf,numpy.asarray(part,dtype=numpy.float64)])
+        if not started:
+            if len(buf) < len(w): continue
+            buf = numpy.concatenate([buf[left:0:-1],buf])
+            started = True
+        if len(buf) >= len(w):
+            yield _convolve(buf,w,flat)
+            buf = buf[len(buf)-len(w)+1:]
+    if not started: raise ValueError('Input vector needs to be bigger than window size.')
+    buf = numpy.concatenate([buf,buf[-1:-right-1:-1]])
+    if len(buf) >= len(w): yield _convolve(buf,w,flat)
+
+def smooth(y,width,window='hanning'):
+    """
+    Return `y` smoothed with the `window` of `width` samples, a new array of the
+    same length. Windows shorter than 3 leave the values unchanged.
+    """
+    y = numpy.asarray(y,dtype=numpy.float64)
+    if y.ndim!=1: raise ValueError('smooth only accepts 1 dimension arrays.')
+    width = int(width)
+    if width<3: return y
+    out = numpy.empty(len(y))
+    pos = 0
+    # with the overlap of the previous chunk and the kernel the FFT size is CHUNK
+    size = max(CHUNK - 2*(width-1),width)
+    for part in smooth_chunks((y[i:i+size] for i in range(0,len(y),size)),width,window):
+        out[pos:pos+len(part)] = part
+        pos += len(part)
+    return out
@@ -0,0 +1,214 @@
+#
+# Run the templates as compiled modules with the parameters passed as a dict,
+# instead of rewriting their source into plot.py (mplot --json)
+#
+#   template.py prefix/plot.json
+#
+# The directive lines of the template are compiled into statements which take the
+# values from the parameters at run time, for example
+#   # xr: xr      ->  xr = __mplot__.expr('xr',globals())
+#   # FILES       ->  files = __mplot__.files
+# with the same semantics as in mplot::init_plot. As there, only the directives of
+# the +keys given are activated, the compiled code therefore depends only on the
+# set of keys and not on their values. It is cached in memory and in __pycache__
+# next to the template; the line numbers of the template are preserved.
+#
+# The parameters, as written by mplot to plot.json:
+#   template        .. path to the template
+#   keys            .. the +key arguments, {key: value or [values]}
+#   labels,files,files2
+#   prefix,formats  .. the output files are prefix.fmt
+#   data_opts       .. the arguments of data.set_opts(), as in plot.py
+#   libdir          .. the directory with mplotlib
+#
+
+import os,re,sys,ast,json,struct,marshal,hashlib,builtins,importlib.util
+
+if __package__ in (None,''):
+    sys.path.insert(0,os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+VERSION = 1
+_codes  = {}
+
+# the directives in the order mplot::init_plot tries them
+_directives = [
+    (re.compile(r"^# (\S+):\s*\{(\S+)\}"),   "{1} = __mplot__.dict('{0}',globals())"),
+    (re.compile(r"^# (\S+):\s*\['(\S+)'\]"), "{1} = __mplot__.str_list('{0}')"),
+    (re.compile(r"^# (\S+):\s*\[\{(\S+)\}\]"), "{1} = __mplot__.dict_list('{0}',globals())"),
+    (re.compile(r"^# (\S+):\s*\[(\S+)\]"),   "{1} = __mplot__.expr_list('{0}',globals())"),
+    (re.compile(r"^# (\S+):\s*\('(\S+)'\)"), "{1} = __mplot__.split('{0}')"),
+    (re.compile(r"^# (\S+):\s*\((\S+)\)"),   "{1} = __mplot__.expr('{0}',globals(),'(%s)')"),
+    (re.compile(r"^# (\S+):\s*'(\S+)'"),     "{1} = __mplot__.str('{0}')"),
+    (re.compile(r"^# (\S+):\s*(\S+)"),       "{1} = __mplot__.expr('{0}',globals())"),
+    (re.compile(r"^# '(\S+)'\s*$"),          "{0} = __mplot__.str('{0}')"),
+    (re.compile(r"^# (\S+)\s*$"),            "{0} = __mplot__.expr('{0}',globals())"),
+]
+_fixed = {
+    '# LABELS':    "labels = __mplot__.labels",
+    '# FILES':     "files = __mplot__.files",
+    '# FILES2':    "files2 = __mplot__.files2",
+    '# LIBDIR':    "sys.path.insert(0,__mplot__.libdir)",
+    '# DATA_OPTS': "data.set_opts(**__mplot__.data_opts)",
+    '# SAVE':      "__mplot__.save(plt)",
+}
+
+def transform(lines,keys):
+    """Returns the template source with the directives of `keys` turned into statements"""
+    out = []
+    for line in lines:
+        stripped = line.rstrip()
+        if stripped in _fixed:
+            out.append(_fixed[stripped]+'\n')
+            continue
+        for regex,stmt in _directives:
+            m = regex.match(line)
+            if m and m.group(1) in keys:
+                line = stmt.format(*m.groups()) + '\n'
+                break
+        out.append(line)
+    return ''.join(out)
+
+def _cache_fname(path,keys):
+    sig = hashlib.sha1(('%d\0' % VERSION + '\0'.join(sorted(keys))).encode()).hexdigest()[:16]
+    name = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(os.path.dirname(path),'__pycache__','%s.mplot-%s.%s.pyc' % (name,sig,sys.implementation.cache_tag))
+
+def compile_template(path,keys):
+    """Returns the code object of the template compiled for the given set of +keys"""
+    path = os.path.abspath(path)
+    st   = os.stat(path)
+    sig  = (path,st.st_mtime_ns,st.st_size,frozenset(keys))
+    if sig in _codes: return _codes[sig]
+
+    # same layout as python's own .pyc: magic, source mtime and size, marshalled code
+    fname  = _cache_fname(path,keys)
+    header = importlib.util.MAGIC_NUMBER + struct.pack('<qq',st.st_mtime_ns,st.st_size)
+    code   = None
+    try:
+        with open(fname,'rb') as fh: buf = fh.read()
+        if buf.startswith(header): code = marshal.loads(buf[len(header):])
+    except (OSError,ValueError,EOFError,TypeError):
+        pass
+    if code==None:
+        with open(path) as fh: src = transform(fh.readlines(),keys)
+        code = compile(src,path,'exec')
+        try:
+            os.makedirs(os.path.dirname(fname),exist_ok=True)
+            tmp = fname + '.tmp.%d' % os.getpid()
+            with open(tmp,'wb') as fh: fh.write(header + marshal.dumps(code))
+            os.replace(tmp,fname)
+        except OSError:
+            pass        # read-only installation
+    _codes[sig] = code
+    return code
+
+def _kwargs(src):
+    # "cache='a',files={..}" -> dict
+    call = ast.parse('f(%s)' % src,mode='eval').body
+    return { kw.arg:ast.literal_eval(kw.value) for kw in call.keywords }
+
+def _pairs(item,unescape):
+    # 'a:1,b=x' -> ["'a':1","'b':x"]
+    out = []
+    for xitem in re.split(r'(?<!\\),' if unescape else ',',item):
+        if unescape: xitem = xitem.replace('\\','')
+        if ':' in xitem: key,val = xitem.split(':')[:2]
+        elif '=' in xitem: key,val = xitem.split('=')[:2]
+        else: key,val = xitem,''
+        out.append("'%s':%s" % (key,val))
+    return out
+
+class Params:
+    """The parameters of one plot, available to the compiled template as __mplot__"""
+    def __init__(self,params):
+        self.params = params
+        self.keys   = params.get('keys',{})
+        self.labels = params.get('labels',[])
+        self.files  = params.get('files',[])
+        self.files2 = params.get('files2',[])
+        self.libdir = params.get('libdir',os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        opts = params.get('data_opts',{})
+        self.data_opts = _kwargs(opts) if isinstance(opts,str) else opts
+        self.figure = None      # the saved figure, the templates close it after # SAVE
+
+    def _values(self,key):
+        val = self.keys[key]
+        return list(val) if isinstance(val,list) else [val]
+
+    def _value(self,key):
+        return self._values(key)[-1]
+
+    def _per_file(self,key):
+        vals = self._values(key)
+        while len(vals) < len(self.files): vals.append(vals[-1])
+        return vals
+
+    def str(self,key):
+        return self._value(key)
+
+    def expr(self,key,glb,fmt='%s'):
+        return eval(fmt % self._value(key),glb)
+
+    def split(self,key):
+        val = self.keys[key]
+        return list(val) if isinstance(val,list) else val.split(',')
+
+    def dict(self,key,glb):
+        out = []
+        for item in self._values(key): out.extend(_pairs(item,True))
+        return eval('{'+','.join(out)+'}',glb)
+
+    def str_list(self,key):
+        return self._per_file(key)
+
+    def expr_list(self,key,glb):
+        return eval('['+','.join(self._per_file(key))+']',glb)
+
+    def dict_list(self,key,glb):
+        return eval('['+','.join(['{'+','.join(_pairs(x,False))+'}' for x in self._per_file(key)])+']',glb)
+
+    def save(self,plt):
+        self.figure = plt.gcf()
+        prefix = self.params['prefix']
+        kwargs = {}
+        if 'dpi' in self.keys: kwargs['dpi'] = eval(self._value('dpi'))
+        from mplotlib import prof
+        with prof.phase('render'):
+            method = self._value('ds') if 'ds' in self.keys else 'minmax'
+            if method!='0':
+                from mplotlib import downsample
+                downsample.downsample_lines(plt.gcf(),method,kwargs.get('dpi'))
+            agg = (self._value('agg') if 'agg' in self.keys else 'auto').split(',')
+            if agg[0]!='0':
+                from mplotlib import aggregate
+                aggregate.aggregate_scatter(plt.gcf(),agg[0],int(float(agg[1])) if len(agg)>1 else 1000000,kwargs.get('dpi'))
+            threshold = int(self._value('raster')) if 'raster' in self.keys else 10000
+            if threshold and [x for x in self.params['formats'] if x in ('pdf','svg','svgz','eps','ps')]:
+                from mplotlib import raster
+                raster.rasterize_dense(plt.gcf(),threshold)
+        for fmt in self.params['formats']:
+            with prof.phase('save.'+fmt): plt.savefig('%s.%s' % (prefix,fmt),**kwargs)
+        prof.finish()
+
+def run(params):
+    """Render one plot, `params` as described at the top; returns the Params with the saved figure"""
+    mplot = Params(params)
+    keys  = mplot.keys
+    if keys.get('prof') and keys['prof']!='0':
+        from mplotlib import prof
+        pstats = params['prefix']+'/prof.pstats' if keys['prof']=='cprofile' else None
+        prof.start(params['prefix']+'/prof.json',pstats)
+    code = compile_template(params['template'],keys)
+    from mplotlib import data
+    data.reset_opts()
+    glb  = {'__name__':'__main__','__file__':params['template'],'__builtins__':builtins,'__mplot__':mplot}
+    exec(code,glb)
+    return mplot
+
+def run_json(fname):
+    with open(fname) as fh: params = json.load(fh)
+    run(params)
+
+if __name__ == '__main__':
+    if len(sys.argv)!=2: sys.exit('Usage: template.py plot.json')
+    run_json(sys.argv[1])
@@ -1,30 +1,15 @@
-#!/usr/bin/python
+#!/usr/bin/env python3
 
 # CMDLINE
 
 import matplotlib as mpl
 mpl.use('Agg')
 import matplotlib.pyplot as plt
-import csv,sys
+import sys
 import numpy
-csv.register_dialect('tab', delimiter='\t', quoting=csv.QUOTE_NONE)
-
-def smooth_data(x,window_len=11,window='hanning'):
-    if x.ndim != 1: raise ValueError, "smooth only accepts 1 dimension arrays."
-    if x.size < window_len: raise ValueError, "Input vector needs to be bigger than window size."
-    if window_len<3: return x
-    if not window in ['flat', 'hanning', 'hamming', 'bartlett', 'blackman']: raise ValueError, "Window is on of 'flat', 'hanning', 'hamming', 'bartlett', 'blackman'"
-    s = numpy.r_[x[window_len-1:0:-1],x,x[-1:-window_len:-1]]
-    if window == 'flat': # moving average
-        w = numpy.ones(window_len,'d')
-    else:
-        w = eval('numpy.'+window+'(window_len)')
-    y = numpy.convolve(w/w.sum(),s,mode='valid')
-    odd = 0
-    if window_len%2: odd = 1
-    y = y[(window_len/2-1):-(window_len/2+odd)]
-    return y
-
+# LIBDIR
+from mplotlib import data,normalize,smoothing
+# DATA_OPTS
 
 def bignum(num):
     s = str(num); out = ''; slen = len(s)
@@ -45,41 +30,19 @@ xlim = None
 if xlim!=None:
     (xmin,xmax) = xlim
 
-xdat = None
-ydat = None
-cdat = []
-with open(fname, 'rb') as f:
-    reader = csv.reader(f, 'tab')
-    tmp = []
-    for row in reader:
-        if row[0][0] == '#': continue
-        if xmin!=None and xmin>float(row[0]): continue
-        if xmax!=None and xmax<float(row[0]): continue
-        tmp.append(row)
-    xdat = [x[0] for x in tmp]
-    ydat = [x[1] for x in tmp]
+xdat,ydat = data.read_range(fname,[0,1],xmin=xmin,xmax=xmax)
 
 norm = None     #   +norm 1
 # norm: norm
-if norm!=None:
-    max = float(ydat[0])
-    for y in ydat:
-        if float(max)<float(y): max = float(y)
-    for j in range(len(ydat)):
-        ydat[j] = float(ydat[j])/max
-
-sum  = 0
-norm = 0
-for y in ydat:
-    norm += float(y)
-for j in range(len(ydat)):
-    sum += float(ydat[j])
-    cdat.append(sum/norm)
+if norm!=None: ydat = normalize.normalize(None,ydat,'max')
+
+cdat = normalize.normalize(None,ydat,'cum')
 
 smooth = None
 # smooth: smooth
-if smooth!=None:
-    ydat = smooth_data(numpy.array(ydat,dtype=numpy.float64),smooth,'hanning')
+smooth_window = 'hanning'   # +smw flat, hamming, bartlett, blackman, tricube (LOWESS weights), savgol or savgol:3
+# smw: 'smooth_window'
+if smooth!=None: ydat = smoothing.smooth(ydat,smooth,smooth_window)
 
 
 wh = (7,5)
@@ -129,9 +92,9 @@ ylim = None
 if ylim!=None:                          # for example: +yr 0,1.1%
     (ymin,ymax) = ylim.split(',')
     if ymin[-1] == '%': 
-        ymin = float(ymin[0:-1])*min(min(ydat))
+        ymin = float(ymin[0:-1])*ydat.min()
     if ymax[-1] == '%': 
-        ymax = float(ymax[0:-1])*float(max(max(ydat)))
+        ymax = float(ymax[0:-1])*ydat.max()
     ax1.set_ylim(float(ymin),float(ymax))
 
 ax1.set_ylabel(label1, color=col1)
@@ -11,12 +11,15 @@
 from collections import OrderedDict
 from functools import partial
 from time import time
-from sklearn import manifold
 
 import matplotlib as mpl
 mpl.use('Agg')
 import matplotlib.pyplot as plt
 from matplotlib.ticker import NullFormatter
+import sys
+# LIBDIR
+from mplotlib import data
+# DATA_OPTS
 
 files  = []
 # FILES
@@ -25,16 +28,9 @@ fname = files[0]
 # # Next line to silence pyflakes. This import is needed.
 # Axes3D
 
-colors = []
-dat = []
-reader = open(fname)
-for line in reader:
-    row = line.rstrip('\n').split('\t')
-    if row[0][0]=='\\': row[0] = row[0][1:]
-    colors.append(row[0])
-    row = row[1:]
-    for i in range(len(row)): row[i] = float(row[i])
-    dat.append(row)
+rows   = data.read_table(fname,str)
+colors = [x[1:] if x[0]=='\\' else x for x in rows[:,0]]
+dat    = rows[:,1:].astype(float)
 
 #   n_points = 100
 #   X, color = datasets.make_s_curve(n_points, random_state=0)
@@ -44,14 +40,16 @@ n_components = 2
 # Create figure
 fig = plt.figure(figsize=(10, 8))
 
-# Set-up manifold methods
-LLE = partial(manifold.LocallyLinearEmbedding, n_neighbors=n_neighbors, n_components=n_components, eigen_solver='auto')
+# Set-up manifold methods, sklearn is imported only when the embedding is computed
+def LLE(**kwargs):
+    from sklearn.manifold import LocallyLinearEmbedding
+    return LocallyLinearEmbedding(n_neighbors=n_neighbors, n_components=n_components, eigen_solver='auto', **kwargs)
 
 methods = OrderedDict()
-methods['LLE'] = LLE(method='standard')
-methods['LTSA'] = LLE(method='ltsa')
-methods['Hessian LLE'] = LLE(method='hessian')
-#methods['Modified LLE'] = LLE(method='modified')
+methods['LLE'] = partial(LLE, method='standard')
+methods['LTSA'] = partial(LLE, method='ltsa')
+methods['Hessian LLE'] = partial(LLE, method='hessian')
+#methods['Modified LLE'] = partial(LLE, method='modified')
 #methods['Isomap'] = manifold.Isomap(n_neighbors, n_components)
 #methods['MDS'] = manifold.MDS(n_components, max_iter=100, n_init=1)
 #methods['SE'] = manifold.SpectralEmbedding(n_components=n_components, n_neighbors=n_neighbors)
@@ -60,7 +58,7 @@ methods['Hessian LLE'] = LLE(method='hessian')
 # Plot results
 for i, (label, method) in enumerate(methods.items()):
     t0 = time()
-    Y = method.fit_transform(dat)
+    Y = method().fit_transform(dat)
     t1 = time()
     print("%s: %.2g sec" % (label, t1 - t0))
     ax = fig.add_subplot(2, 5, 2 + i + (i > 3))
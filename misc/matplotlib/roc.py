@@ -22,6 +22,10 @@ import matplotlib as mpl
 mpl.use('Agg')
 import matplotlib.pyplot as plt
 import sys
+import numpy
+# LIBDIR
+from mplotlib import data
+# DATA_OPTS
 
 style = 'mine'
 # sty: 'style'
@@ -34,32 +38,19 @@ nTP_tot = 0
 nFN_tot = 0      # +fn 105
 # fn: nFN_tot
 
-dat = []
-with open(files[0], 'r') as f:
-    tmp = []
-    for line in f:
-        row = line.split("\t")
-        row[-1] = row[-1].rstrip('\n')
-        value = float(row[0])
-        is_tp = int(row[1])
-        if is_tp!=0 and is_tp!=1: sys.exit('Expected [01] in the is_tp column, found: ',line)
-        if is_tp==1: nTP_tot += 1
-        else: nFP_tot += 1
-        dat.append([value,is_tp])
-
-sdat = sorted(dat, key=lambda x:x[0], reverse=True)
-dat  = []
-prev = None
-nFP  = 0
-nTP  = 0
-for x in sdat:
-    if x[1]==1: nTP += 1
-    else: nFP += 1
-    if prev==x[0]: continue
-    prev = x[0]
-    xval = nFP / (nFP_tot+nTP_tot)      # FP rate
-    yval = nTP / (nFN_tot+nTP_tot)      # TP rate
-    dat.append([xval,yval])
+value,is_tp = data.read_cols(files[0],[0,1],[float,int])
+if ((is_tp!=0) & (is_tp!=1)).any(): sys.exit('Expected [01] in the is_tp column, found: %d' % is_tp[(is_tp!=0) & (is_tp!=1)][0])
+nTP_tot = int(is_tp.sum())
+nFP_tot = len(is_tp) - nTP_tot
+
+# Walk the values from the highest and place a point at the first occurrence of each value
+idx   = numpy.argsort(-value,kind='stable')
+value = value[idx]
+nTP   = numpy.cumsum(is_tp[idx])
+nFP   = numpy.arange(1,len(idx)+1) - nTP
+first = numpy.ones(len(value),dtype=bool)
+first[1:] = value[1:]!=value[:-1]
+dat = numpy.column_stack((nFP[first]/(nFP_tot+nTP_tot), nTP[first]/(nFN_tot+nTP_tot)))    # FP rate, TP rate
 
 # Alternative colors can be given as pre-defined colors or explicitly
 #   +cl 'default'   (same as +cl '#337ab7,#f0ad4e,#5cb85c,#5bc0de,#d9534f,grey,black')
@@ -82,7 +73,7 @@ fig, ax1 = plt.subplots(1, 1, figsize=wh)
 for i in range(len(files)):
     args = plt_args[i]
     if style=='mine': args = dict({'zorder':100,'clip_on':False},**args)
-    ax1.plot([row[0] for row in dat], [row[1] for row in dat],**args)
+    ax1.plot(dat[:,0],dat[:,1],**args)
 
 xlabel = 'FP rate'
 # xl: 'xlabel'
@@ -104,7 +95,7 @@ xlim = None         # for example: +xr 0,1.1%
 if xlim!=None:
     x = xlim.split(',')
     if x[1][-1] == '%':
-        x[1] = float(x[1][0:-1])*max([row[0] for row in dat])
+        x[1] = float(x[1][0:-1])*dat[:,0].max()
     if x[0]!='': ax1.set_xlim(left=float(x[0]))
     if x[1]!='': ax1.set_xlim(right=float(x[1]))
 
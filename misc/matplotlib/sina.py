@@ -23,6 +23,9 @@ from matplotlib.gridspec import GridSpec
 from matplotlib.patches import Polygon
 import matplotlib.cm as cm
 import sys,random
+# LIBDIR
+from mplotlib import data
+# DATA_OPTS
 
 fs = None   # +fs 18    # increase font size of all texts
 # fs: fs
@@ -52,7 +55,7 @@ wh = (5,4)  # height ratios
 nbin = 100     # +n 100
 # n: nbin
 
-jitter = ['0,0']  # +jr 0.5,0.5       # x=fraction of the maximum value,y=abs,y%=rel
+jitter = '0,0'    # +jr 0.5,0.5       # x=fraction of the maximum value,y=abs,y%=rel
 # jr: 'jitter'
 jitter = jitter.split(',')
 
@@ -89,32 +92,31 @@ def read_data(fname):
     global xmin,xmax,jitter
     ymin = ymax = None
     dat  = { 'raw':{}, 'binned':{}, 'box':{}, 'xticks':[], 'xtick_labels':[] }
-    file = open(fname,'r')
-    for line in file:
-        row = line.rstrip('\n').split('\t')
-        if row[0][0] == '#': continue
-        bar = row[0]
-        if bar not in dat['raw']:
-            dat['raw'][bar] = []
-            dat['box'][bar] = []
-            dat['xticks'].append(len(dat['raw'])+1)
-            dat['xtick_labels'].append(row[0])
-        y = float(row[1])
-        if ymin==None or ymin>y: ymin = y
-        if ymax==None or ymax<y: ymax = y
-        c = 1
-        if do_color: c = float(row[2])
-        dat['raw'][bar].append({'y':y,'c':c})
-        if do_box: dat['box'][bar].append(float(row[3]))
+    cols  = [0,1]
+    types = [str,float]
+    if do_color: cols.append(2); types.append(float)
+    if do_box: cols.append(3); types.append(float)
+    cols = data.read_cols(fname,cols,types,strata=0)
+    bar,y = cols[0],cols[1]
+    c = cols[2] if do_color else np.ones(len(y))
+    if len(y):
+        ymin = y.min()
+        ymax = y.max()
+    for key,rows in data.group_by(bar,np.arange(len(bar))).items():
+        dat['raw'][key] = (y[rows],c[rows])
+        dat['box'][key] = cols[3][rows] if do_box else []
+        dat['xticks'].append(len(dat['raw'])+1)
+        dat['xtick_labels'].append(key)
 
     for bar in dat['raw']:
         bins = [{'y':0,'n':0,'c':[]} for x in range(nbin+1)]
-        raw  = dat['raw'][bar]
-        for row in raw:
-            i = int(nbin*(row['y']-ymin)/(ymax-ymin))
-            bins[i]['y'] = row['y']
-            bins[i]['n'] += 1
-            bins[i]['c'].append(row['c'])
+        yraw,craw = dat['raw'][bar]
+        if ymax>ymin: ibin = (nbin*(yraw-ymin)/(ymax-ymin)).astype(int)
+        else: ibin = np.zeros(len(yraw),dtype=int)      # constant y, a single bin
+        for i,rows in data.group_by(ibin,np.arange(len(ibin))).items():
+            bins[i]['y'] = yraw[rows[-1]]
+            bins[i]['n'] = len(rows)
+            bins[i]['c'] = list(craw[rows])
         dat['binned'][bar] = bins
 
     nmax = 0
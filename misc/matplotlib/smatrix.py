@@ -1,4 +1,4 @@
-#!/usr/bin/python3.4
+#!/usr/bin/env python3
 #
 # similarity matrix
 #
@@ -11,13 +11,10 @@ import numpy as np
 import matplotlib as mpl
 mpl.use('Agg')
 import matplotlib.pyplot as plt
-import csv, random
-
-from scipy.spatial.distance import pdist, squareform
-from sklearn import datasets
-from fastcluster import linkage
-
-csv.register_dialect('tab', delimiter='\t', quoting=csv.QUOTE_NONE)
+import sys, random
+# LIBDIR
+from mplotlib import data
+# DATA_OPTS
 
 def seriation(Z,N,cur_index):
     '''
@@ -55,6 +52,8 @@ def compute_serial_matrix(dist_mat,method="ward"):
         a sorted distance matrix according to the order implied 
         by the hierarchical tree (dendrogram)
     '''
+    from scipy.spatial.distance import squareform
+    from fastcluster import linkage
     N = len(dist_mat)
     flat_dist_mat = squareform(dist_mat)
     res_linkage = linkage(flat_dist_mat, method=method,preserve_input=True)
@@ -79,26 +78,17 @@ xlim = None
 if xlim!=None:
     (xmin,xmax) = xlim
 
-mat = []
-raw = {}
-ids = {}
-with open(file, 'r') as f:
-    reader = csv.reader(f, 'tab')
-    for row in reader:
-        if row[0][0] == '#': continue
-        id1  = row[0]
-        id2  = row[1]
-        dist = row[2]
-        if id1 not in ids: ids[id1] = len(ids)
-        if id2 not in ids: ids[id2] = len(ids)
-        i1 = ids[id1]
-        i2 = ids[id2]
-        key = "%d.%d" % (i1,i2)
-        raw[key] = [i1,i2,float(dist)]
-    mat = np.zeros(shape=(len(ids),len(ids)))
-    for x in raw.values():
-        mat[x[0]][x[1]] = x[2]
-        mat[x[1]][x[0]] = x[2]
+id1,id2,dist = data.read_cols(file,[0,1,2],[str,str,float])
+uniq,first,inv = np.unique(np.column_stack((id1,id2)).reshape(-1),return_index=True,return_inverse=True)
+order = np.argsort(first)           # the ids are numbered in the order of appearance
+rank  = np.empty(len(order),dtype=int)
+rank[order] = np.arange(len(order))
+ids = { uniq[i]:rank[i] for i in order }
+i1  = rank[inv.reshape(-1)[0::2]]
+i2  = rank[inv.reshape(-1)[1::2]]
+mat = np.zeros(shape=(len(ids),len(ids)))
+mat[i1,i2] = dist
+mat[i2,i1] = dist
 N = len(ids)
 
 # np.random.seed(seed=1)
@@ -1,4 +1,4 @@
-#!/usr/bin/env python
+#!/usr/bin/env python3
 #
 # zcat lengths.txt.gz | mplot violin -o plots/lengths.png
 # zcat lengths.txt.gz | mplot violin -o plots/lengths.png +lb 'XY:Label 1;ZY:Label 2;;WZ:Label 3, padded'
@@ -19,8 +19,11 @@ import matplotlib as mpl
 mpl.use('Agg')
 import matplotlib.pyplot as plt
 import itertools
-import csv,sys,random
-csv.register_dialect('tab', delimiter='\t', quoting=csv.QUOTE_NONE)
+import sys,random,inspect
+import numpy
+# LIBDIR
+from mplotlib import data,sketch
+# DATA_OPTS
 
 style = None        # xkcd, ggplot, ...
 # sty: 'style'
@@ -32,19 +35,16 @@ elif style!=None and style!='mine':
 files = []
 # FILES
 
-order = []
+exact_max = 1000000      # larger groups are summarized by a quantile sketch, ~0.7% rank error: +exact 1e8
+# exact: exact_max
+
+# one pass over the files in chunks, the memory is bounded by the sketches
 groups = {}
-for i in range(len(files)):
-    fname = files[i]
-    with open(fname) as f:
-        reader = csv.reader(f, 'tab')
-        for row in reader:
-            if row[0][0] == '#': continue
-            row[0] = row[0].replace('\\n','\n')
-            if row[0] not in groups:
-                groups[row[0]] = []
-                order.append(row[0])
-            groups[row[0]].append(float(row[1]))
+for fname in files:
+    for grp,val in data.read_chunks(fname,[0,1],[str,float],strata=0):
+        sketch.update_groups(groups,grp,val,exact=int(exact_max))
+groups = dict((key.replace('\\n','\n'),quant) for key,quant in groups.items())
+order  = list(groups.keys())
 
 def percentile(vals,p):
     N = len(vals)
@@ -108,14 +108,27 @@ med = []    # medians
 iqr = []    # inter-quantile ranges
 avs = []    # upper and lower adjacent values
 dat = []
+stats = []  # violin statistics of summarized groups
 for grp in keys:
     #print grp
-    sdat = sorted(groups[grp])
+    if not groups[grp].is_exact():
+        if trim_pctl!=None and (trim_pctl[0]>1 or trim_pctl[1]>1): trim_pctl = [trim_pctl[0]/100.,trim_pctl[1]/100.]
+        st = groups[grp].summary(trim=trim_pctl)
+        med.append(st['med'])
+        iqr.append([st['q1'],st['q3']])
+        avs.append([max(st['min'],min(st['q1'],st['q1']-1.5*st['iqr'])),min(st['max'],max(st['q3'],st['q3']+1.5*st['iqr']))])
+        coords = numpy.linspace(st['min'],st['max'],100)
+        stats.append({'coords':coords,'vals':groups[grp].density(coords,trim=trim_pctl),'mean':st['mean'],
+                      'median':st['med'],'min':st['min'],'max':st['max'],'quantiles':[]})
+        dat.append([])
+        continue
+    sdat = groups[grp].sorted()
     if trim_pctl!=None: sdat = trim_at_percentile(sdat,trim_pctl)
     med.append(percentile(sdat,0.5))
     iqr.append([percentile(sdat,0.25),percentile(sdat,0.75)])
     avs.append(adjacent_values(sdat))
     dat.append(sdat)
+    stats.append(None)
 
 wh = (7,5)
 # wh: wh
@@ -149,13 +162,21 @@ else:
 ecolor = 'black'
 # ec: 'ecolor'
 
-plot_dat = 0        # show data points? +pd 1
+plot_dat = 0        # show data points? +pd 1, only groups with the exact values
 # pd: plot_dat
 
 fig, ax = plt.subplots(1, 1, figsize=wh)
 
 try:
-    parts = ax.violinplot(dat,pos,showmeans=False,showmedians=False,showextrema=False)
+    if all(st==None for st in stats):
+        parts = ax.violinplot(dat,pos,showmeans=False,showmedians=False,showextrema=False)
+    else:
+        from matplotlib import cbook,mlab
+        for i in range(len(dat)):
+            if stats[i]==None: stats[i] = cbook.violin_stats(dat[i],lambda x,coords: mlab.GaussianKDE(x).evaluate(coords))[0]
+        # vert is deprecated since matplotlib 3.11
+        vert = {'orientation':'vertical'} if 'orientation' in inspect.signature(ax.violin).parameters else {'vert':True}
+        parts = ax.violin(stats,pos,showmeans=False,showmedians=False,showextrema=False,**vert)
     if plot_dat:
         for i in range(len(dat)): ax.plot([i + 0.25*random.random() - 0.125 for x in dat[i]],dat[i],'.',color=ecolor,alpha=0.5)
 except Exception as e:
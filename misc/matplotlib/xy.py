@@ -21,10 +21,11 @@ import matplotlib as mpl
 mpl.use('Agg')
 import matplotlib.pyplot as plt
 import itertools
-import csv,sys
+import sys
 import numpy
-import random
-csv.register_dialect('tab', delimiter='\t', quoting=csv.QUOTE_NONE)
+# LIBDIR
+from mplotlib import data,normalize,smoothing
+# DATA_OPTS
 
 style = None        # xkcd, ggplot, ...
 # sty: 'style'
@@ -33,22 +34,6 @@ if style=='xkcd':
 elif style!=None and style!='mine':
     plt.style.use(style)
 
-def smooth_data(x,window_len=11,window='hanning'):
-    if x.ndim != 1: raise Exception("smooth only accepts 1 dimension arrays.")
-    if x.size < window_len: raise Exception("Input vector needs to be bigger than window size.")
-    if window_len<3: return x
-    if not window in ['flat', 'hanning', 'hamming', 'bartlett', 'blackman']: raise Exception("Window is on of 'flat', 'hanning', 'hamming', 'bartlett', 'blackman'")
-    s = numpy.r_[x[window_len-1:0:-1],x,x[-1:-window_len:-1]]
-    if window == 'flat': # moving average
-        w = numpy.ones(window_len,'d')
-    else:
-        w = eval('numpy.'+window+'(window_len)')
-    y = numpy.convolve(w/w.sum(),s,mode='valid')
-    odd = 0
-    if window_len%2: odd = 1
-    y = y[(int(window_len/2)-1):-(int(window_len/2)+odd)]
-    return y
-
 def bignum(num):
     s = str(num); out = ''; slen = len(s)
     for i in range(slen):
@@ -98,98 +83,52 @@ ydat2 = []
 yerr  = []
 sdat  = []
 cdat  = []
+# the columns read for each type, x and y are filled in when not read
+read_cols = { 'xy':['x','y'], 'xyc':['x','y','c'], 'y':['y'], 'density':['x'], 'xyci':['x','y','y0','y1'],
+              'xys':['x','y','s'], 'xysc':['x','y','s'], 'xyy':['x','y','y2'] }
+presorted = 0       # the input is sorted by x, +xr then reads only the range: +sorted 1
+# sorted: presorted
+
+names = read_cols[type]
+range_args = {}
+if 'x' in names: range_args = {'xcol':names.index('x'),'xmin':xmin,'xmax':xmax,'presorted':presorted}
+dat = data.read_files(files,list(range(len(names))),[str if name=='c' else float for name in names],**range_args)
 for i in range(len(files)):
-    xdat.append([])
-    ydat.append([])
-    if type=='xyci': yerr.append([[],[]])
-    if type=='xys' or type=='xysc': sdat.append([])
-    if type=='xyy': ydat2.append([])
-    if type=='xyc': cdat.append([])
-    fname = files[i]
-    with open(fname, 'r') as f:
-        reader = csv.reader(f, 'tab')
-        tmp = []
-        for row in reader:
-            if row[0][0] == '#': continue
-            xval = None
-            yval = None
-            sval = None
-            if type=='xy' or type=='xyc':
-                xval = float(row[0])
-                yval = float(row[1])
-            elif type=='y':
-                xval = len(tmp)
-                yval = float(row[0])
-            elif type=='density':
-                xval = float(row[0])
-                yval = 0
-            elif type=='xyci':
-                xval = float(row[0])
-                yval = float(row[1])
-                yerr[i][0].append(yval-float(row[2]))
-                yerr[i][1].append(float(row[3])-yval)
-            elif type=='xys' or type=='xysc' or type=='xyy':
-                xval = float(row[0])
-                yval = float(row[1])
-                sval = float(row[2])
-            if xmin!=None and xmin>xval: continue
-            if xmax!=None and xmax<xval: continue
-            if jitter[0]!=0: xval = xval + random.random()*jitter[0] - 0.5*jitter[0]
-            if jitter[1]!=0: yval = yval + random.random()*jitter[1] - 0.5*jitter[1]
-            if type=='xys' or type=='xysc' or type=='xyy': tmp.append([xval,yval,sval])
-            elif type=='xyc': tmp.append([xval,yval,row[2]])
-            else: tmp.append([xval,yval])
-        xdat[i] = [float(x[0]) for x in tmp]
-        ydat[i] = [float(x[1]) for x in tmp]
-        if type=='xys' or type=='xysc': sdat[i] = [float(x[2]) for x in tmp]
-        if type=='xyc': cdat[i] = [x[2] for x in tmp]
-        if type=='xyy': ydat2[i] = [float(x[2]) for x in tmp]
+    col = dict(zip(names,dat[i]))
+    if 'x' not in col: col['x'] = numpy.arange(len(col['y']),dtype=numpy.float64)
+    if 'y' not in col: col['y'] = numpy.zeros(len(col['x']))
+    keep = numpy.ones(len(col['x']),dtype=bool)
+    if xmin!=None: keep &= ~(col['x']<xmin)
+    if xmax!=None: keep &= ~(col['x']>xmax)
+    if not keep.all(): col = dict((name,arr[keep]) for name,arr in col.items())
+    x,y = col['x'],col['y']
+    if type=='xyci': yerr.append([y-col['y0'],col['y1']-y])
+    if jitter[0]!=0: x = x + numpy.random.random(len(x))*jitter[0] - 0.5*jitter[0]
+    if jitter[1]!=0: y = y + numpy.random.random(len(y))*jitter[1] - 0.5*jitter[1]
+    xdat.append(x)
+    ydat.append(y)
+    if 's' in col: sdat.append(col['s'])
+    if 'c' in col: cdat.append(col['c'])
+    if 'y2' in col: ydat2.append(col['y2'])
+
+bw = 0.25          # +type density kernel bandwidth: +bw scott, silverman or a multiple of the standard deviation
+# bw: 'bw'
+
+kde_grid = 512      # +type density number of points: +kgrid 2048
+# kgrid: kde_grid
 
 if type=='density':
-    from scipy.stats import gaussian_kde
-    if xmin==None:
-        for xarr in xdat:
-            if xmin==None:
-                xmin = xarr[0]
-                xmax = xarr[0]
-            for xval in xarr:
-                if xmin>xval: xmin = xval
-                if xmax<xval: xmax = xval
+    from mplotlib import kde
+    xs,dens = kde.density(xdat,xmin,xmax,int(kde_grid),bw)
     for i in range(len(xdat)):
-        density = gaussian_kde(xdat[i])
-        xs = numpy.linspace(xmin,xmax)
-        density.covariance_factor = lambda : .25
-        density._compute_covariance()
         xdat[i] = xs
-        ydat[i] = density(xs)
+        ydat[i] = dens[i]
 
-norm = None         # +norm max=1, sum=1, dnsity=1
+norm = None         # +norm max=1, sum=1, dnsity=1, area=1 (weighted by x-intervals), cum=1 (cumulative)
 # norm: 'norm'
 if norm!=None:
-    x=norm.split('=')
-    if x[0]=='max':
-        for i in range(len(files)):
-            max = float(ydat[i][0])
-            for y in ydat[i]:
-                if float(max)<float(y): max = float(y)
-            for j in range(len(ydat[i])):
-                ydat[i][j] = float(x[1])*float(ydat[i][j])/max
-    elif x[0]=='sum':
-        for i in range(len(files)):
-            sum = 0
-            for y in ydat[i]: sum += float(y)
-            for j in range(len(ydat[i])):
-                ydat[i][j] = float(x[1])*float(ydat[i][j])/sum
-    elif x[0]=='dnsity':
-        for i in range(len(files)):
-            sum = 0
-            for y in ydat[i]: sum += float(y)
-            ynew = []
-            for j in range(len(ydat[i])):
-                xdist = xdat[i][j]
-                if j+1<len(ydat[i]): xdist = xdat[i][j+1] - xdat[i][j]
-                ynew.append(float(x[1])*float(ydat[i][j])/sum/xdist)
-            ydat[i] = ynew
+    mode,scale = normalize.parse(norm)
+    for i in range(len(files)): ydat[i] = normalize.normalize(xdat[i],ydat[i],mode,scale)
 
 
 fill = None         # +fill 0   (baseline)
@@ -201,24 +140,6 @@ yscale = None       # +ys log,symlog
 xscale = None       # +xs log,symlog
 # xs: 'xscale'
 
-# # There is a bug in some versions of matplotlib: even values outside
-# # set_xlim are plotted. Therefore we need to trim manually.
-# if xlim!=None:
-#     for i in range(len(files)):
-#         jmin = -1
-#         jmax = len(xdat[i])
-#         xdat[i],ydat[i] = zip(*sorted(zip(xdat[i],ydat[i])))
-#         for j in range(len(xdat[i])):
-#             if j>0 and xdat[i][j-1] > xdat[i][j]: print("The data needs to be sorted by x with +xr"); sys.exit()
-#             if 'left'  in xlim and xdat[i][j]<xlim['left']  and (jmin==-1 or xdat[i][jmin] < xdat[i][j]): jmin = j
-#             if 'right' in xlim and xdat[i][j]>xlim['right'] and (jmax==len(xdat[i]) or xdat[i][jmax] > xdat[i][j]): jmax = j
-#         if jmax<len(xdat[i]):
-#             xdat[i] = xdat[i][:jmax]
-#             ydat[i] = ydat[i][:jmax]
-#         if jmin>=0:
-#             xdat[i] = xdat[i][jmin+1:]
-#             ydat[i] = ydat[i][jmin+1:]
-
 wh = (7,5)
 # wh: wh
 fig, ax1 = plt.subplots(1, 1, figsize=wh)
@@ -257,6 +178,8 @@ if lines!=None:
 
 smooth = None
 # smooth: smooth
+smooth_window = 'hanning'   # +smw flat, hamming, bartlett, blackman, tricube (LOWESS weights), savgol or savgol:3
+# smw: 'smooth_window'
 lb = []
 # lb: ['lb']
 lt = []             # line types:   +lt --
@@ -270,7 +193,7 @@ for i in range(len(files)):
     label = ''
     if i <len(lb): label = lb[i]
     if smooth!=None:
-        ydat[i] = smooth_data(numpy.array(ydat[i],dtype=numpy.float64),smooth,'hanning')
+        ydat[i] = smoothing.smooth(ydat[i],smooth,smooth_window)
     args = plt_args[-1]
     if i in plt_args: args = plt_args[i]
     if i < len(lc): args['color'] = lc[i]
@@ -339,9 +262,9 @@ ylim = None
 if ylim!=None:                          # for example: +yr 0,1.1%
     (ymin,ymax) = ylim.split(',')
     if ymin[-1] == '%':
-        ymin = float(ymin[0:-1])*min(min(ydat))
+        ymin = float(ymin[0:-1])*numpy.min([numpy.min(y) for y in ydat])
     if ymax[-1] == '%':
-        ymax = float(ymax[0:-1])*float(max(max(ydat)))
+        ymax = float(ymax[0:-1])*numpy.max([numpy.max(y) for y in ydat])
     ax1.set_ylim(float(ymin),float(ymax))
 
 ylabel = None
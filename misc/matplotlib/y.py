@@ -1,4 +1,4 @@
-#!/usr/bin/python
+#!/usr/bin/env python3
 
 # CMDLINE
 
@@ -6,26 +6,11 @@ import matplotlib as mpl
 mpl.use('Agg')
 import matplotlib.pyplot as plt
 import itertools
-import csv
+import sys
 import numpy
-csv.register_dialect('tab', delimiter='\t', quoting=csv.QUOTE_NONE)
-
-def smooth_data(x,window_len=11,window='hanning'):
-    if x.ndim != 1: raise ValueError, "smooth only accepts 1 dimension arrays."
-    if x.size < window_len: raise ValueError, "Input vector needs to be bigger than window size."
-    if window_len<3: return x
-    if not window in ['flat', 'hanning', 'hamming', 'bartlett', 'blackman']: raise ValueError, "Window is on of 'flat', 'hanning', 'hamming', 'bartlett', 'blackman'"
-    s = numpy.r_[x[window_len-1:0:-1],x,x[-1:-window_len:-1]]
-    if window == 'flat': # moving average
-        w = numpy.ones(window_len,'d')
-    else:
-        w = eval('numpy.'+window+'(window_len)')
-    y = numpy.convolve(w/w.sum(),s,mode='valid')
-    odd = 0
-    if window_len%2: odd = 1
-    y = y[(window_len/2-1):-(window_len/2+odd)]
-    return y
-
+# LIBDIR
+from mplotlib import data,normalize,smoothing
+# DATA_OPTS
 
 def bignum(num):
     s = str(num); out = ''; slen = len(s)
@@ -44,30 +29,19 @@ elif style!=None and style!='mine':
 files  = []
 # FILES
 
-mpl.rcParams['axes.color_cycle'] = [ '#337ab7', '#f0ad4e', '#5cb85c', '#5bc0de', '#d9534f', 'grey', 'black' ]
+colors = [ '#337ab7', '#f0ad4e', '#5cb85c', '#5bc0de', '#d9534f', 'grey', 'black' ]
+try:
+    mpl.rcParams['axes.prop_cycle'] = mpl.cycler(color=colors)
+except:
+    # deprecated:
+    mpl.rcParams['axes.color_cycle'] = colors
 
-ydat = []
-cnts = []
-for i in range(len(files)):
-    ydat.append([])
-    fname = files[i]
-    with open(fname, 'rb') as f:
-        reader = csv.reader(f, 'tab')
-        tmp = []
-        for row in reader:
-            if row[0][0] != '#': tmp.append(row)
-            else: cnts.append(row[0][2:])
-        ydat[i] = [x[0] for x in tmp]
+ydat = [dat[0] for dat in data.read_files(files,[0])]
 
 norm = None
 # norm: norm
 if norm!=None:
-    for i in range(len(files)):
-        max = float(ydat[i][0])
-        for y in ydat[i]:
-            if float(max)<float(y): max = float(y)
-        for j in range(len(ydat[i])):
-            ydat[i][j] = float(ydat[i][j])/max
+    for i in range(len(files)): ydat[i] = normalize.normalize(None,ydat[i],'max')
 
 
 wh = (7,5)
@@ -79,6 +53,8 @@ plt_args = {}       # for example: +pa "mec='grey',mfc='grey',alpha=0.7"
 
 smooth = None
 # smooth: smooth
+smooth_window = 'hanning'   # +smw flat, hamming, bartlett, blackman, tricube (LOWESS weights), savgol or savgol:3
+# smw: 'smooth_window'
 lb = []
 # lb: ['lb']
 lt = []
@@ -92,7 +68,7 @@ for i in range(len(files)):
     if i <len(lb): label = lb[i]
     if cl!=None: plt_args['color'] = cl[i]
     if smooth!=None:
-        ydat[i] = smooth_data(numpy.array(ydat[i],dtype=numpy.float64),smooth,'hanning')
+        ydat[i] = smoothing.smooth(ydat[i],smooth,smooth_window)
     ax1.plot(ydat[i],line,label=label,**plt_args)
 
 xsci = None
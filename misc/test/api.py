@@ -0,0 +1,19 @@
+#!/usr/bin/env python3
+#
+# The in-process API returns the figure the template drew when no output is
+# given and does not keep the arrays. Prints the templates with problems.
+#
+
+import os,sys
+import numpy
+sys.path.insert(0,os.path.join(os.path.dirname(os.path.realpath(__file__)),'..','matplotlib'))
+import matplotlib
+matplotlib.use('Agg')
+from mplotlib import api,data
+
+x = numpy.arange(100.)
+y = x**2
+for name,artists in [('xy','lines'),('hexbin','collections')]:
+    fig = api.render(name,(x,y))
+    if not fig.axes or not getattr(fig.axes[0],artists): print('%s: no %s in the returned figure' % (name,artists))
+    if data.opts['arrays']: print('%s: the arrays are kept' % name)
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+#
+# The cached columns of a file are used while the file is unchanged and are
+# parsed anew after it changes, also when the size stays the same. Prints the
+# cases with differences.
+#
+
+import os,sys,tempfile
+import numpy
+sys.path.insert(0,os.path.join(os.path.dirname(os.path.realpath(__file__)),'..','matplotlib'))
+from mplotlib import data
+
+def write(fname,vals,mtime):
+    with open(fname,'w') as fh:
+        fh.write('# x\ty\n')
+        for i in range(len(vals)): fh.write('%d\t%s\n' % (i,vals[i]))
+    os.utime(fname,ns=(mtime,mtime))
+
+def check(case,exp,cached):
+    x,y = data.read_cols(fname,[0,1])
+    if not numpy.array_equal(y,numpy.asarray(exp,dtype=float)): print('%s: read %s, expected %s' % (case,y.tolist(),exp))
+    if isinstance(y,numpy.memmap)!=cached: print('%s: %s' % (case,'parsed again' if cached else 'served from the stale cache'))
+
+tmp = tempfile.TemporaryDirectory()
+fname = os.path.join(tmp.name,'01.dat')
+data.set_opts(cache=tmp.name)
+sec = 10**9
+
+write(fname,['1.5','2.5','3.5'],1*sec)
+check('first read',[1.5,2.5,3.5],False)
+check('second read',[1.5,2.5,3.5],True)
+
+write(fname,['1.5','2.5','3.5'],2*sec)
+check('identical content rewritten',[1.5,2.5,3.5],True)
+
+write(fname,['4.5','5.5','6.5'],3*sec)
+check('same size, different content',[4.5,5.5,6.5],False)
+check('same size, different content, second read',[4.5,5.5,6.5],True)
+
+write(fname,['7.25','8.25'],4*sec)
+check('different size',[7.25,8.25],False)
+
+data.reset_opts()
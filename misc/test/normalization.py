@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+#
+# Check the +norm modes of normalize.normalize() against values computed by
+# hand, with and without NaN values, and the parsing of "mode=K". Prints the
+# modes with differences.
+#
+
+import os,sys
+import numpy
+sys.path.insert(0,os.path.join(os.path.dirname(os.path.realpath(__file__)),'..','matplotlib'))
+from mplotlib import normalize
+
+x = [0,1,3,4]
+y = [1,2,4,1]
+tests = [
+    # mode      scale   expected
+    ('max',     1.,     [0.25,0.5,1,0.25]),
+    ('max',     100.,   [25,50,100,25]),
+    ('sum',     1.,     [0.125,0.25,0.5,0.125]),
+    ('sum',     2.,     [0.25,0.5,1,0.25]),
+    ('dnsity',  1.,     [0.125/1,0.25/2,0.5/1,0.125/1]),
+    ('area',    1.,     [1/10.,2/10.,4/10.,1/10.]),       # sum(y*dx) = 1*1+2*2+4*1+1*1
+    ('cum',     1.,     [0.125,0.375,0.875,1]),
+    ('cum',     8.,     [1,3,7,8]),
+]
+for mode,scale,exp in tests:
+    out = normalize.normalize(x,y,mode,scale)
+    if not numpy.allclose(out,exp): print('%s=%g: %s, expected %s' % (mode,scale,out.tolist(),exp))
+
+# NaN values stay NaN and are left out of the totals
+ynan = [1,numpy.nan,3,4]
+for mode,exp in [('max',[0.25,numpy.nan,0.75,1]),('sum',[0.125,numpy.nan,0.375,0.5]),('cum',[0.125,0.125,0.5,1])]:
+    out = normalize.normalize(x,ynan,mode)
+    if not numpy.allclose(out,exp,equal_nan=True): print('%s with NaN: %s, expected %s' % (mode,out.tolist(),exp))
+
+if len(normalize.normalize([],[],'max'))!=0: print('empty input')
+if normalize.parse('sum')!=('sum',1.) or normalize.parse('max=100')!=('max',100.): print('parse')
+try:
+    normalize.parse('median')
+    print('parse accepted an unknown mode')
+except ValueError:
+    pass
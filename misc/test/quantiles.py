@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+#
+# The rank error of the sketch.Quantiles must stay within the bounds given in
+# sketch.py, ~1.33% for k=200 and ~0.7% for the default k=400, also for merged
+# sketches; below the `exact` limit the quantiles are those of numpy. Prints
+# the distributions and sizes with larger errors.
+#
+
+import os,sys
+import numpy
+sys.path.insert(0,os.path.join(os.path.dirname(os.path.realpath(__file__)),'..','matplotlib'))
+from mplotlib import sketch
+
+def rank_error(qnt,xs):
+    q = numpy.linspace(0,1,201)
+    rank = numpy.searchsorted(xs,qnt.quantile(q),side='right')/float(len(xs))
+    return numpy.abs(rank-q).max()
+
+rng = numpy.random.default_rng(1)
+for dist in ['normal','exponential','uniform']:
+    x  = getattr(rng,dist)(size=300000)
+    xs = numpy.sort(x)
+
+    exact = sketch.Quantiles()
+    exact.update(x[:1000])
+    if not exact.is_exact() or not numpy.allclose(exact.quantile([0,0.1,0.5,0.9,1]),numpy.percentile(x[:1000],[0,10,50,90,100])):
+        print('%s: exact quantiles differ' % dist)
+
+    for k,eps in [(200,0.0133),(400,0.007)]:
+        qnt = sketch.Quantiles(k=k,exact=1000)
+        for start in range(0,len(x),10000): qnt.update(x[start:start+10000])
+        if qnt.is_exact(): print('%s k=%d: not sketched' % (dist,k))
+        if qnt.min!=xs[0] or qnt.max!=xs[-1]: print('%s k=%d: min,max %f,%f' % (dist,k,qnt.min,qnt.max))
+        err = rank_error(qnt,xs)
+        if err>eps: print('%s k=%d: rank error %f' % (dist,k,err))
+
+        parts = [sketch.Quantiles(k=k,exact=1000,seed=i) for i in range(3)]
+        for i in range(3): parts[i].update(x[i::3])
+        for i in range(1,3): parts[0].merge(parts[i])
+        err = rank_error(parts[0],xs)
+        if parts[0].n!=len(x) or err>eps: print('%s k=%d: merged n=%d rank error %f' % (dist,k,parts[0].n,err))
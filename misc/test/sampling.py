@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+#
+# The seeded sample (mplot -s, --seed) is reproducible: the same seed picks
+# the same rows in repeated reads, in separate passes over the columns and
+# when the rows are sampled by index instead of line by line. Prints the cases
+# with differences.
+#
+
+import os,sys,tempfile
+import numpy
+sys.path.insert(0,os.path.join(os.path.dirname(os.path.realpath(__file__)),'..','matplotlib'))
+from mplotlib import data,sample
+
+tmp = tempfile.TemporaryDirectory()
+fname = os.path.join(tmp.name,'in.txt')
+with open(fname,'w') as fh:
+    for i in range(20000): fh.write('%s\t%d\t%d\n' % ('abc'[i%3] if i<19990 else 'd',i,i%7))
+
+def read(seed,strata=None):
+    data.set_opts(sample={'size':100,'seed':seed})
+    out = data.read_cols(fname,[0,1,2],[str,int,int],strata)
+    data.reset_opts()
+    return out
+
+grp,idx,mod = read(3)
+if len(idx)!=100: print('sampled %d rows, expected 100' % len(idx))
+if not (numpy.diff(idx)>0).all(): print('the sample is not in the input order')
+if not numpy.array_equal(mod,idx%7): print('the columns of different types come from different rows')
+if not numpy.array_equal(read(3)[1],idx): print('the same seed picked different rows')
+if numpy.array_equal(read(4)[1],idx): print('a different seed picked the same rows')
+
+lines = sample.sample_lines([[str(i) for i in range(j,j+1000)] for j in range(0,20000,1000)],100,3)
+if not numpy.array_equal(sample.sample_index(20000,100,3),numpy.asarray(lines,dtype=int)):
+    print('sample_index() and sample_lines() picked different rows')
+
+grp,idx,mod = read(3,strata=0)
+cnts = { key:numpy.sum(grp==key) for key in 'abcd' }
+if cnts!={'a':100,'b':100,'c':100,'d':10}: print('stratified sample sizes %s' % cnts)
+if not numpy.array_equal(read(3,strata=0)[1],idx): print('the same seed picked different rows with strata')
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+#
+# Compare mplotlib.smoothing with the smooth_data() the templates used before,
+# over the whole curve including both ends. Prints the widths, windows and
+# chunk sizes with differences.
+#
+
+import os,sys
+import numpy
+sys.path.insert(0,os.path.join(os.path.dirname(os.path.realpath(__file__)),'..','matplotlib'))
+from mplotlib import smoothing
+
+def smooth_data(x,window_len=11,window='hanning'):
+    if x.ndim != 1: raise Exception("smooth only accepts 1 dimension arrays.")
+    if x.size < window_len: raise Exception("Input vector needs to be bigger than window size.")
+    if window_len<3: return x
+    if not window in ['flat', 'hanning', 'hamming', 'bartlett', 'blackman']: raise Exception("Window is on of 'flat', 'hanning', 'hamming', 'bartlett', 'blackman'")
+    s = numpy.r_[x[window_len-1:0:-1],x,x[-1:-window_len:-1]]
+    if window == 'flat': # moving average
+        w = numpy.ones(window_len,'d')
+    else:
+        w = eval('numpy.'+window+'(window_len)')
+    y = numpy.convolve(w/w.sum(),s,mode='valid')
+    odd = 0
+    if window_len%2: odd = 1
+    y = y[(int(window_len/2)-1):-(int(window_len/2)+odd)]
+    return y
+
+rng = numpy.random.RandomState(1)
+for chunk in [smoothing.CHUNK,300]:
+    smoothing.CHUNK = chunk
+    for n in [3,11,50,1000,5000]:
+        x = rng.normal(size=n).cumsum()
+        for width in [2,3,4,5,10,11,64,65,100]:
+            if width>n: continue
+            for window in ['flat','hanning','hamming','bartlett','blackman']:
+                exp = smooth_data(x,width,window)
+                out = smoothing.smooth(x,width,window)
+                if len(out)!=len(exp) or not numpy.allclose(out,exp,rtol=1e-9,atol=1e-9):
+                    print('n=%d width=%d window=%s chunk=%d' % (n,width,window,chunk))
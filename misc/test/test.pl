@@ -0,0 +1,274 @@
+#!/usr/bin/env perl
+#
+#   Copyright (C) 2019 Genome Research Ltd.
+#
+#   Author: Petr Danecek <pd3@sanger.ac.uk>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+use strict;
+use warnings;
+use Carp;
+use FindBin;
+use lib "$FindBin::Bin";
+use Getopt::Long;
+use File::Temp qw/ tempfile tempdir /;
+use Cwd qw/ abs_path /;
+
+my $opts = parse_params();
+test_render_cache_gz($opts);
+test_blank_lines_gz($opts);
+test_smoothing($opts);
+test_api($opts);
+test_batch_invalid_line($opts);
+test_column_cache($opts);
+test_sampling($opts);
+test_seed($opts);
+test_quantiles($opts);
+test_kde($opts);
+test_normalization($opts);
+test_json($opts);
+
+print "\nNumber of tests:\n";
+printf "    total   .. %d\n", $$opts{nok}+$$opts{nfailed};
+printf "    passed  .. %d\n", $$opts{nok};
+printf "    failed  .. %d\n", $$opts{nfailed};
+print "\n";
+
+exit ($$opts{nfailed} != 0);
+
+#--------------------
+
+sub error
+{
+    my (@msg) = @_;
+    if ( scalar @msg ) { confess @msg; }
+    print
+        "About: mplot test script\n",
+        "Usage: test.pl [OPTIONS]\n",
+        "Options:\n",
+        "   -e, --exec python=<path>        The python interpreter to use.\n",
+        "   -t, --temp-dir <path>           When given, temporary files will not be removed.\n",
+        "   -h, -?, --help                  This help message.\n",
+        "\n";
+    exit -1;
+}
+sub parse_params
+{
+    my $opts = { python=>"python3", keep_files=>0, nok=>0, nfailed=>0 };
+    my $help;
+    Getopt::Long::Configure('bundling');
+    my $ret = GetOptions (
+            'e|exec=s' => sub { my ($tool, $path) = split /=/, $_[1]; $$opts{$tool} = $path if $path },
+            't|temp-dir:s' => \$$opts{keep_files},
+            'h|?|help' => \$help
+            );
+    if ( !$ret or $help ) { error(); }
+    $$opts{tmp} = $$opts{keep_files} ? $$opts{keep_files} : tempdir(CLEANUP=>1);
+    if ( $$opts{keep_files} ) { cmd("mkdir -p $$opts{keep_files}"); }
+    $$opts{path} = $FindBin::RealBin;
+    $$opts{bin}  = $FindBin::RealBin;
+    $$opts{bin}  =~ s{/test/?$}{};
+    delete($ENV{MPLOT_RENDER_CACHE});
+    return $opts;
+}
+sub _cmd
+{
+    my ($cmd) = @_;
+    my $kid_io;
+    my @out;
+    my $pid = open($kid_io, "-|");
+    if ( !defined $pid ) { error("Cannot fork: $!"); }
+    if ($pid)
+    {
+        # parent
+        @out = <$kid_io>;
+        close($kid_io);
+    }
+    else
+    {
+        # child
+        open(STDERR,'>&',\*STDOUT) or error("Cannot dup STDOUT: $!");
+        exec('/bin/bash', '-o','pipefail','-c', $cmd) or error("Cannot execute the command [/bin/sh -o pipefail -c $cmd]: $!");
+    }
+    return ($? >> 8, join('',@out));
+}
+sub cmd
+{
+    my ($cmd) = @_;
+    my ($ret,$out) = _cmd($cmd);
+    if ( $ret ) { error("The command failed: $cmd\n", $out); }
+    return $out;
+}
+sub test_cmd
+{
+    my ($opts,%args) = @_;
+    my ($package, $filename, $line, $test)=caller(1);
+    $test =~ s/^.+:://;
+
+    print "$test:\n";
+    print "\t$args{cmd}\n";
+
+    my ($ret,$out) = _cmd("$args{cmd}");
+    if ( $ret ) { failed($opts,$test,"Non-zero status $ret\n$out"); return; }
+    if ( $args{exp} ne $out )
+    {
+        failed($opts,$test,"The outputs differ:\n\texpected: $args{exp}\n\tobserved: $out");
+        return;
+    }
+    passed($opts,$test);
+}
+sub failed
+{
+    my ($opts,$test,$reason) = @_;
+    $$opts{nfailed}++;
+    if ( defined $reason ) { print "\n\t$reason"; }
+    print "\n.. failed ...\n\n";
+}
+sub passed
+{
+    my ($opts,$test) = @_;
+    $$opts{nok}++;
+    print ".. ok\n\n";
+}
+sub write_gz
+{
+    my ($path,@lines) = @_;
+    open(my $fh,"| gzip -c > $path") or error("gzip -c > $path: $!");
+    print $fh @lines;
+    close($fh) or error("close gzip -c > $path");
+}
+
+
+# The tests --------------------------
+
+sub test_render_cache_gz
+{
+    my ($opts) = @_;
+
+    # A .gz input is read by the template directly, its .dat file is never
+    # written. The first run renders and stores the plot, the second one is
+    # served from the cache, a different -f selection is rendered anew.
+    my $dir = "$$opts{tmp}/render_cache_gz";
+    cmd("mkdir -p $dir");
+    write_gz("$dir/in.txt.gz", map { "$_\t" . ($_*$_) . "\t" . (2*$_) . "\n" } 1..50);
+    my $mplot = "$$opts{bin}/mplot xy -F --render-cache $dir/cache -o a.png";
+    test_cmd($opts,exp=>"chmod +x a/plot.py && a/plot.py\nunchanged\nchmod +x a/plot.py && a/plot.py\n2\n",cmd=>
+        "cd $dir && ($mplot in.txt.gz && rm a.png && $mplot in.txt.gz && test -s a.png && $mplot -f 1,3 in.txt.gz) 2>&1 | grep -o '^chmod .*\\|unchanged'" .
+        " && ls cache | wc -l");
+}
+
+sub test_blank_lines_gz
+{
+    my ($opts) = @_;
+
+    # The template reads the .gz input itself, comments and blank or
+    # whitespace-only lines are skipped as in the copied .dat files
+    my $dir = "$$opts{tmp}/blank_lines_gz";
+    cmd("mkdir -p $dir");
+    write_gz("$dir/in.txt.gz", "# x\ty\n", "1\t2\n", "\n", "2\t4\n", "  \n", "\t\n", "3\t6\n", "\n");
+    for my $delim ('','-d tab')
+    {
+        test_cmd($opts,exp=>"",cmd=>"cd $dir && $$opts{bin}/mplot xy -F $delim -o a.png in.txt.gz >/dev/null 2>&1 && test -s a.png");
+    }
+}
+
+sub test_smoothing
+{
+    my ($opts) = @_;
+    test_cmd($opts,exp=>"",cmd=>"$$opts{python} $$opts{path}/smoothing.py");
+}
+
+sub test_api
+{
+    my ($opts) = @_;
+    test_cmd($opts,exp=>"",cmd=>"$$opts{python} $$opts{path}/api.py");
+}
+
+sub test_batch_invalid_line
+{
+    my ($opts) = @_;
+
+    # A manifest line naming a missing input fails alone, the others are rendered
+    my $dir = "$$opts{tmp}/batch_invalid_line";
+    cmd("mkdir -p $dir");
+    cmd("cd $dir && printf '1\\t2\\n2\\t3\\n' > in.txt");
+    cmd("cd $dir && printf 'xy -o a.png in.txt\\nxy -o b.png missing.txt\\nxy -o c.png +type y in.txt\\n' > manifest.txt");
+    test_cmd($opts,exp=>"failed(prepare)\nok\nok\n",cmd=>
+        "(cd $dir && $$opts{bin}/mplot -F -b manifest.txt -j 2 2>/dev/null; true) | grep -o '^ok\\|^failed([a-z]*)' | sort && test -s $dir/a.png && test -s $dir/c.png");
+}
+
+sub test_column_cache
+{
+    my ($opts) = @_;
+    test_cmd($opts,exp=>"",cmd=>"$$opts{python} $$opts{path}/column_cache.py");
+}
+
+sub test_sampling
+{
+    my ($opts) = @_;
+    test_cmd($opts,exp=>"",cmd=>"$$opts{python} $$opts{path}/sampling.py");
+}
+
+sub test_seed
+{
+    my ($opts) = @_;
+
+    # The same seed gives the same sampled plot twice, a different seed another one
+    my $dir = "$$opts{tmp}/seed";
+    cmd("mkdir -p $dir");
+    cmd("cd $dir && seq 1 5000 | awk '{print \$1\"\\t\"sin(\$1)}' > in.txt");
+    my $mplot = "$$opts{bin}/mplot -F -s 100 -o a.png";
+    test_cmd($opts,exp=>"1\n2\n",cmd=>
+        "cd $dir && for seed in 3 3 4; do $mplot --seed \$seed xy +type xy +pa \"marker='.',ls=''\" in.txt >/dev/null 2>&1 && md5sum < a.png; done | sort | uniq -c | awk '{print \$1}' | sort");
+}
+
+sub test_quantiles
+{
+    my ($opts) = @_;
+    test_cmd($opts,exp=>"",cmd=>"$$opts{python} $$opts{path}/quantiles.py");
+}
+
+sub test_kde
+{
+    my ($opts) = @_;
+    test_cmd($opts,exp=>"",cmd=>"$$opts{python} $$opts{path}/kde.py");
+}
+
+sub test_normalization
+{
+    my ($opts) = @_;
+    test_cmd($opts,exp=>"",cmd=>"$$opts{python} $$opts{path}/normalization.py");
+}
+
+sub test_json
+{
+    my ($opts) = @_;
+
+    # The compiled template run with plot.json draws the same image as plot.py
+    my $dir = "$$opts{tmp}/json";
+    cmd("mkdir -p $dir");
+    cmd("cd $dir && seq 1 200 | awk '{print \$1\"\\t\"sin(\$1/10)\"\\t\"\$1%3}' > in.txt");
+    for my $args ('xy +title T +yr -1,1 +norm max','xy +type density','hexbin','box','violin','manhattan')
+    {
+        my $mplot = "$$opts{bin}/mplot -F -o a.png";
+        test_cmd($opts,exp=>"2\n",cmd=>
+            "cd $dir && for json in '' --json; do rm -f a.png && $mplot \$json $args in.txt >/dev/null 2>&1 && md5sum < a.png; done | sort | uniq -c | awk '{print \$1}'");
+    }
+}